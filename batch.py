@@ -0,0 +1,14 @@
+from controller import controller as controller
+import argparse
+
+if __name__ == '__main__':
+    # Batch prediction, run this to predict every row of a CSV file without starting the application
+    parser = argparse.ArgumentParser(description='Predict the clusters and advice of every row of a CSV file')
+    parser.add_argument('input', help='CSV file in the layout of res/finaladvice.csv, the Advice column is optional')
+    parser.add_argument('output', help='CSV file to write the input rows with their predictions to')
+    parser.add_argument('--chunk-rows', type=int, default=0,
+                        help='Amount of rows predicted at once, BATCH_CHUNK_ROWS of config.json by default')
+    args = parser.parse_args()
+    BatchInstance = controller.Controller(serve=False)
+    BatchInstance.predict_csv(args.input, args.output,
+                              args.chunk_rows or BatchInstance.config['DEFAULT']['BATCH_CHUNK_ROWS'])
@@ -0,0 +1,99 @@
+try:
+    from controller import controller
+    # Import of Helper libraries
+    import argparse
+    import os
+    import random
+    import tempfile
+    import time
+    # Import Scapy libraries
+    from scapy.layers.dns import DNS, DNSQR
+    from scapy.layers.inet import IP, ICMP, UDP, TCP, Ether
+    from scapy.all import Raw, rdpcap, wrpcap, PcapReader
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+
+def make_capture(location, count):
+    """Function for writing a pcap-file with a mix of TCP, UDP, DNS and ICMP packets
+
+    :param location: Location of the pcap-file to write
+    :param count: Amount of packets to write
+    :return: None
+
+    """
+    packets = []
+    timestamp = 1500000000.0
+    for i in range(count):
+        src = '10.0.{}.{}'.format(i % 7, i % 250 + 1)
+        dst = '192.168.1.{}'.format(i % 13 + 1)
+        kind = i % 4
+        if kind == 0:
+            pkt = Ether() / IP(src=src, dst=dst) / TCP(sport=40000 + i % 1000, dport=443) / Raw(b'x' * (i % 1400))
+        elif kind == 1:
+            pkt = Ether() / IP(src=src, dst=dst) / UDP(sport=5000, dport=6000) / Raw(b'y' * 100)
+        elif kind == 2:
+            pkt = Ether() / IP(src=src, dst=dst) / UDP(sport=53000, dport=53) / DNS(qd=DNSQR(qname='example.com'))
+        else:
+            pkt = Ether() / IP(src=src, dst=dst) / ICMP()
+        timestamp += random.random() / 100
+        pkt.time = timestamp
+        packets.append(pkt)
+    wrpcap(location, packets)
+
+
+def time_path(name, count, function):
+    """Function for timing a single statistics path
+
+    :param name: Name of the path, used in the report
+    :param count: Amount of packets in the capture
+    :param function: Function without arguments running the path
+    :return: Packets per second of the path
+
+    """
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print('{:<8} {:>10.3f} s {:>14,.0f} packets/s'.format(name, elapsed, count / elapsed))
+    return count / elapsed
+
+
+def run(location, count):
+    """Function for comparing the scapy statistics paths with the raw decoder
+
+    :param location: Location of the pcap-file to analyse
+    :param count: Amount of packets in the pcap-file
+    :return: None
+
+    """
+    def run_stream():
+        reader = PcapReader(location)
+        try:
+            controller.Controller.make_streaming_statistics(reader, location)
+        finally:
+            reader.close()
+
+    def run_fast():
+        with open(location, 'rb') as f:
+            controller.Controller.make_fast_statistics(f.read(), location)
+
+    memory = time_path('memory', count, lambda: controller.Controller.make_statistics(rdpcap(location), location))
+    time_path('stream', count, run_stream)
+    fast = time_path('fast', count, run_fast)
+    print('Raw decoder speedup over the scapy path: {:.1f}x'.format(fast / memory))
+
+
+if __name__ == '__main__':
+    # Run from the project root: python -m benchmark.decoder_benchmark [--pcap FILE] [--count N]
+    parser = argparse.ArgumentParser(description='Benchmark the pcap statistics paths')
+    parser.add_argument('--pcap', help='pcap-file to analyse, a synthetic capture is made when left out')
+    parser.add_argument('--count', type=int, default=20000, help='amount of packets in the synthetic capture')
+    args = parser.parse_args()
+    if args.pcap:
+        run(args.pcap, sum(1 for _ in PcapReader(args.pcap)))
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            capture = os.path.join(directory, 'benchmark.pcap')
+            make_capture(capture, args.count)
+            run(capture, args.count)
@@ -0,0 +1,112 @@
+try:
+    # Import of Helper libraries
+    import argparse
+    import socket
+    import statistics
+    import subprocess
+    import sys
+    import time
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+# Modules timed by default with their import budget in seconds
+DEFAULT_BUDGETS = {'controller.controller': 1.5, 'view.gui': 1.0}
+# Libraries that are imported on first use and may not be loaded by importing the modules
+DEFERRED_LIBRARIES = ('pandas', 'sklearn', 'kmodes', 'scapy', 'joblib')
+# Code run in a fresh interpreter, prints the import time and the loaded top-level packages
+CHILD_CODE = ("import sys, time\n"
+              "start = time.perf_counter()\n"
+              "import {}\n"
+              "print(time.perf_counter() - start)\n"
+              "print(','.join(sorted(set(name.partition('.')[0] for name in sys.modules))))\n")
+
+
+def time_import(module):
+    """Function for timing the import of a module in a fresh interpreter
+
+    :param module: Name of the module, for example 'controller.controller'
+    :return: Tuple of the import time in seconds and the set of loaded top-level packages
+
+    """
+    output = subprocess.run([sys.executable, '-c', CHILD_CODE.format(module)], stdout=subprocess.PIPE, check=True,
+                            universal_newlines=True).stdout.splitlines()
+    return float(output[-2]), set(output[-1].split(','))
+
+
+def time_serve(port, timeout):
+    """Function for timing the start of main.py until the app server accepts connections
+
+    :param port: Port the app server listens on
+    :param timeout: Seconds to wait for the app server
+    :return: Seconds until the port accepted a connection
+    :raises RuntimeError: When main.py stops or does not listen within the timeout
+
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, 'main.py'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError('main.py stopped with exit code {}'.format(process.returncode))
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=0.1):
+                    return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError('main.py did not listen on port {} within {} s'.format(port, timeout))
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    """Function for checking the import times against their budget
+
+    Every module is imported several times in a fresh interpreter and the fastest import is compared with the
+    budget, so a cold disk cache or a busy machine does not fail the check. The command fails when a module is over
+    its budget or loads one of the libraries that should only be imported on first use.
+
+    :return: None
+
+    """
+    parser = argparse.ArgumentParser(description='Check the import time of the application against a budget')
+    parser.add_argument('--module', nargs=2, action='append', metavar=('MODULE', 'SECONDS'),
+                        help='module and its budget in seconds, the controller and the GUI by default')
+    parser.add_argument('--repeats', type=int, default=5, help='amount of times every module is imported')
+    parser.add_argument('--serve', type=float, metavar='SECONDS',
+                        help='also check that main.py listens within this amount of seconds')
+    parser.add_argument('--port', type=int, default=8050, help='port the app server of main.py listens on')
+    args = parser.parse_args()
+
+    budgets = dict((module, float(seconds)) for module, seconds in args.module) if args.module else DEFAULT_BUDGETS
+    failed = False
+    for module, budget in budgets.items():
+        timings = []
+        loaded = set()
+        for _ in range(args.repeats):
+            seconds, loaded = time_import(module)
+            timings.append(seconds)
+        deferred = sorted(loaded.intersection(DEFERRED_LIBRARIES))
+        over = min(timings) > budget
+        failed = failed or over or bool(deferred)
+        print('{:<24} best {:>7.3f} s median {:>7.3f} s budget {:>6.2f} s {}'.format(
+            module, min(timings), statistics.median(timings), budget, 'OVER BUDGET' if over else 'ok'))
+        if deferred:
+            print('{:<24} imports {} at once'.format(module, ', '.join(deferred)))
+    if args.serve is not None:
+        seconds = time_serve(args.port, max(60.0, args.serve * 10))
+        over = seconds > args.serve
+        failed = failed or over
+        print('{:<24} {:>12.3f} s budget {:>6.2f} s {}'.format('main.py listening', seconds, args.serve,
+                                                              'OVER BUDGET' if over else 'ok'))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    # Run from the project root: python -m benchmark.import_budget [--module MODULE SECONDS] [--serve SECONDS]
+    main()
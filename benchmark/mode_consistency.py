@@ -0,0 +1,110 @@
+try:
+    from benchmark import pcap_generator
+    from controller import controller
+    from controller import pcapIndex
+    # Import of Helper libraries
+    import argparse
+    import mmap
+    import os
+    import sys
+    import tempfile
+    # Import Scapy libraries
+    from scapy.all import rdpcap, PcapReader
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+
+def make_statistics(mode, location, workers):
+    """Function for calculating the statistics of a capture with one PCAP_MODE
+
+    :param mode: Name of the mode: 'memory', 'stream', 'fast', 'indexed' or 'parallel'
+    :param location: Location of the pcap-file
+    :param workers: Amount of worker processes of the parallel mode
+    :return: Statistics Model instance
+
+    """
+    if mode == 'memory':
+        return controller.Controller.make_statistics(rdpcap(location), location)
+    if mode == 'stream':
+        reader = PcapReader(location)
+        try:
+            return controller.Controller.make_streaming_statistics(reader, location)
+        finally:
+            reader.close()
+    if mode == 'indexed':
+        index = pcapIndex.PcapIndex.open(location)
+        try:
+            return controller.Controller.make_indexed_statistics(index, location)
+        finally:
+            index.close()
+    if mode == 'parallel':
+        return controller.Controller.make_parallel_statistics(location, location, workers)
+    with open(location, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return controller.Controller.make_fast_statistics(buf, location)
+        finally:
+            buf.close()
+
+
+def get_summary(stats):
+    """Function for summarising the values of a statistics instance that every mode has to agree on
+
+    :param stats: Statistics Model instance
+    :return: Dictionary of the name and value of every compared value
+
+    """
+    addresses = stats.decode_addresses(range(len(stats.address_table)))
+    return {'packets': stats.packet_count,
+            'protocol counts': (stats.tcp_count, stats.udp_count, stats.dns_count, stats.icmp_count),
+            'total bytes': stats.total_bytes,
+            'total time': round(float(stats.total_time), 6),
+            'flow count': stats.flow_count,
+            'source addresses': dict(zip(addresses, stats.src_counts.tolist())),
+            'destination addresses': dict(zip(addresses, stats.dst_counts.tolist())),
+            'IP protocols': dict(zip(stats.protocol_table, stats.protocol_counts.tolist())),
+            'byte series': (stats.byte_series.width, stats.byte_series.origin,
+                            stats.byte_series.byte_counts.tolist(), stats.byte_series.packet_counts.tolist()),
+            'top flow bytes': sorted(stats.top_flows['bytes'].tolist())}
+
+
+def main():
+    """Function for checking that every PCAP_MODE gives the same statistics
+
+    A synthetic capture is analysed in every mode. Flows of the capture are idle for longer than the flow idle
+    timeout now and then, so the modes also have to split them the same way. The command fails when a value
+    differs from the value of the first mode.
+
+    :return: None
+
+    """
+    parser = argparse.ArgumentParser(description='Check that every pcap mode gives the same statistics')
+    parser.add_argument('--count', type=int, default=300000, help='amount of packets of the synthetic capture')
+    parser.add_argument('--span', type=float, default=3600.0, help='seconds between the first and last packet')
+    parser.add_argument('--flows', type=int, default=1000, help='amount of flows of the synthetic capture')
+    parser.add_argument('--workers', type=int, default=4, help='worker processes of the parallel mode')
+    parser.add_argument('--modes', nargs='+', default=['memory', 'stream', 'fast', 'indexed', 'parallel'],
+                        choices=['memory', 'stream', 'fast', 'indexed', 'parallel'], help='modes to compare')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        location = os.path.join(directory, 'capture.pcap')
+        pcap_generator.make_capture(location, args.count, flows=args.flows, span=args.span)
+        summaries = dict((mode, get_summary(make_statistics(mode, location, args.workers))) for mode in args.modes)
+    expected = summaries[args.modes[0]]
+    differences = 0
+    for mode in args.modes[1:]:
+        for name, value in summaries[mode].items():
+            if value != expected[name]:
+                differences += 1
+                print('{} differs between {} and {}'.format(name, args.modes[0], mode))
+    print('{} modes, {:,} packets, {:,} flows, {} differences'.format(
+        len(args.modes), expected['packets'], expected['flow count'], differences))
+    if differences:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    # Run from the project root: python -m benchmark.mode_consistency [--count N] [--modes MODE ...]
+    main()
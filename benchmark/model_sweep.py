@@ -0,0 +1,140 @@
+try:
+    from controller import datasetLoader
+    from model import featureEncoder
+    # Import of Helper libraries
+    import argparse
+    import json
+    import os
+    import pickle
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+    import numpy as np
+    import pandas as pd
+    # Import of the estimators and Sklearn Helper libraries
+    from kmodes.kmodes import KModes
+    from sklearn.cluster import KMeans
+    from sklearn.naive_bayes import GaussianNB
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn import preprocessing
+    from sklearn.metrics import silhouette_score
+    from sklearn.model_selection import StratifiedKFold, cross_validate
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+# Configurations of the sweep: name of the estimator and its parameters
+SWEEP = ([('GaussianNB', {'var_smoothing': value}) for value in (1e-9, 1e-7, 1e-5, 1e-3)] +
+         [('RandomForest', {'n_estimators': trees, 'max_depth': depth, 'random_state': 15425})
+          for trees in (10, 25, 50, 100, 200) for depth in (None, 8)] +
+         [('KMeans', {'n_clusters': clusters, 'random_state': 241}) for clusters in (3, 5, 8)] +
+         [('KModes', {'n_clusters': clusters, 'init': 'Huang', 'n_init': 5}) for clusters in (3, 5, 8)])
+ESTIMATORS = {'GaussianNB': GaussianNB, 'RandomForest': RandomForestClassifier, 'KMeans': KMeans, 'KModes': KModes}
+CLASSIFIERS = ('GaussianNB', 'RandomForest')
+
+
+def load_data(location):
+    """Function for loading the dataset and encoding it the way the controller does
+
+    :param location: Location of the dataset CSV in the finaladvice.csv layout
+    :return: Tuple of the raw feature values (for kmodes), the encoded feature values and the encoded advice
+
+    """
+    dataset = datasetLoader.read_csv(location)
+    raw, _ = datasetLoader.get_views(dataset)
+    encoders = dict((column, preprocessing.LabelEncoder().fit(raw[column].astype(str)))
+                    for column in datasetLoader.CATEGORY_COLUMNS if column != datasetLoader.LABEL_COLUMN)
+    encoder = featureEncoder.FeatureEncoder.from_label_encoders(list(raw.columns), encoders)
+    values, _ = encoder.encode_frame(raw)
+    labels = preprocessing.LabelEncoder().fit_transform(dataset[datasetLoader.LABEL_COLUMN].astype(str))
+    return raw.astype(object).values, values.values.astype(np.float64), labels
+
+
+def measure_latency(model, rows, repeats):
+    """Function for measuring the latency of single-row predictions
+
+    :param model: Fitted model
+    :param rows: Array of rows to predict one at a time
+    :param repeats: Amount of predictions to time
+    :return: Tuple of the p50 and p99 latency in milliseconds
+
+    """
+    timings = np.empty(repeats)
+    for number in range(repeats):
+        row = rows[number % len(rows)].reshape(1, -1)
+        start = time.perf_counter()
+        model.predict(row)
+        timings[number] = time.perf_counter() - start
+    return np.percentile(timings, 50) * 1000, np.percentile(timings, 99) * 1000
+
+
+def run_configuration(name, params, location, folds, repeats):
+    """Function for benchmarking one configuration, run in the worker processes
+
+    Classifiers are scored with stratified cross-validation on the accuracy, clustering models with the silhouette
+    score (kmeans) or the clustering cost (kmodes) of a fit on the whole dataset.
+
+    :param name: Name of the estimator
+    :param params: Dictionary of the parameters of the estimator
+    :param location: Location of the dataset CSV
+    :param folds: Amount of cross-validation folds
+    :param repeats: Amount of single-row predictions to time
+    :return: Dictionary with the results of the configuration
+
+    """
+    raw, values, labels = load_data(location)
+    result = {'model': name, 'params': json.dumps(params, sort_keys=True)}
+    if name in CLASSIFIERS:
+        scores = cross_validate(ESTIMATORS[name](**params), values, labels,
+                                cv=StratifiedKFold(n_splits=folds, shuffle=True, random_state=123456))
+        result['accuracy'] = float(np.mean(scores['test_score']))
+        result['accuracy_std'] = float(np.std(scores['test_score']))
+        result['fit_s'] = float(np.mean(scores['fit_time']))
+    data = raw if name == 'KModes' else values
+    start = time.perf_counter()
+    model = ESTIMATORS[name](**params).fit(data) if name not in CLASSIFIERS else \
+        ESTIMATORS[name](**params).fit(values, labels)
+    if name not in CLASSIFIERS:
+        result['fit_s'] = time.perf_counter() - start
+        if name == 'KMeans':
+            result['silhouette'] = float(silhouette_score(values, model.labels_))
+        else:
+            result['cost'] = float(model.cost_)
+    result['p50_ms'], result['p99_ms'] = measure_latency(model, data, repeats)
+    result['size_kb'] = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)) / 1024
+    return result
+
+
+def main():
+    """Function for running the model selection sweep
+
+    Every configuration runs in a worker process. The comparison table is printed and written as CSV.
+
+    :return: None
+
+    """
+    parser = argparse.ArgumentParser(description='Cross-validated sweep over the models and their parameters')
+    parser.add_argument('--dataset', default=os.path.join('res', 'finaladvice.csv'),
+                        help='dataset in the finaladvice.csv layout')
+    parser.add_argument('--folds', type=int, default=5, help='amount of cross-validation folds')
+    parser.add_argument('--repeats', type=int, default=300, help='amount of single-row predictions to time')
+    parser.add_argument('--workers', type=int, default=0, help='amount of worker processes, 0 uses all cores')
+    parser.add_argument('--output', default='model_sweep.csv', help='CSV file to write the comparison table to')
+    args = parser.parse_args()
+
+    names = list(name for name, _ in SWEEP)
+    params = list(params for _, params in SWEEP)
+    amount = len(SWEEP)
+    with ProcessPoolExecutor(max_workers=args.workers or os.cpu_count()) as pool:
+        results = list(pool.map(run_configuration, names, params, [args.dataset] * amount,
+                                [args.folds] * amount, [args.repeats] * amount))
+    table = pd.DataFrame(results)
+    table = table.sort_values(['model', 'accuracy', 'p50_ms'], ascending=[True, False, True], na_position='last')
+    table.to_csv(args.output, index=False)
+    with pd.option_context('display.max_rows', None, 'display.width', 200, 'display.float_format', '{:.4f}'.format):
+        print(table.to_string(index=False))
+    print('Comparison table written to ' + args.output)
+
+
+if __name__ == '__main__':
+    # Run from the project root: python -m benchmark.model_sweep [--folds N] [--workers N] [--output FILE]
+    main()
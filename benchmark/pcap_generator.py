@@ -0,0 +1,285 @@
+try:
+    # Import of Helper libraries
+    import argparse
+    import struct
+    import time
+    import numpy as np
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+# Default share of every protocol in the generated captures
+DEFAULT_MIX = {'tcp': 0.6, 'udp': 0.2, 'dns': 0.1, 'icmp': 0.1}
+PROTOCOLS = ('tcp', 'udp', 'dns', 'icmp')
+# Packets generated and written at once
+CHUNK_PACKETS = 262144
+# Question of the generated DNS queries (example.com, type A, class IN)
+DNS_QUESTION = b'\x07example\x03com\x00\x00\x01\x00\x01'
+# Layout of the record header and the packet headers of a record, with big-endian network fields. The transport
+# fields overlap: TCP, UDP (with the DNS header and question) and ICMP each use their own fields after offset 50
+RECORD_FIELDS = (('ts_sec', '<u4', 0), ('ts_usec', '<u4', 4), ('caplen', '<u4', 8), ('wirelen', '<u4', 12),
+                 ('eth_dst_oui', '>u2', 16), ('eth_dst', '>u4', 18), ('eth_src_oui', '>u2', 22),
+                 ('eth_src', '>u4', 24), ('ethertype', '>u2', 28),
+                 ('ip_version', 'u1', 30), ('ip_length', '>u2', 32), ('ip_id', '>u2', 34), ('ip_flags', '>u2', 36),
+                 ('ip_ttl', 'u1', 38), ('ip_proto', 'u1', 39), ('ip_checksum', '>u2', 40), ('ip_src', '>u4', 42),
+                 ('ip_dst', '>u4', 46),
+                 ('sport', '>u2', 50), ('dport', '>u2', 52),
+                 ('tcp_seq', '>u4', 54), ('tcp_flags', '>u2', 62), ('tcp_window', '>u2', 64),
+                 ('tcp_checksum', '>u2', 66),
+                 ('udp_length', '>u2', 54), ('udp_checksum', '>u2', 56), ('dns_id', '>u2', 58),
+                 ('dns_flags', '>u2', 60), ('dns_questions', '>u2', 62),
+                 ('dns_question', ('u1', len(DNS_QUESTION)), 70),
+                 ('icmp_type', '>u2', 50), ('icmp_checksum', '>u2', 52), ('icmp_id', '>u2', 54),
+                 ('icmp_seq', '>u2', 56))
+IP_OFFSET = 30
+TRANSPORT_OFFSET = 50
+# Length of the record header and packet headers of every protocol, the block is padded to an even length
+HEADER_LENGTHS = {'tcp': TRANSPORT_OFFSET + 20, 'udp': TRANSPORT_OFFSET + 8,
+                  'dns': TRANSPORT_OFFSET + 20 + len(DNS_QUESTION), 'icmp': TRANSPORT_OFFSET + 8}
+BLOCK_SIZE = max(HEADER_LENGTHS.values()) + max(HEADER_LENGTHS.values()) % 2
+RECORD_DTYPE = np.dtype({'names': list(name for name, _, _ in RECORD_FIELDS),
+                         'formats': list(kind for _, kind, _ in RECORD_FIELDS),
+                         'offsets': list(offset for _, _, offset in RECORD_FIELDS), 'itemsize': BLOCK_SIZE})
+# Payload sizes (smallest and largest) and server ports of every protocol
+PAYLOAD_SIZES = {'tcp': (0, 1400), 'udp': (16, 512), 'dns': (0, 0), 'icmp': (56, 56)}
+SERVER_PORTS = {'tcp': (443, 80, 22, 8080), 'udp': (443, 123, 5000, 1900), 'dns': (53,), 'icmp': (0,)}
+IP_PROTOCOLS = {'tcp': 6, 'udp': 17, 'dns': 17, 'icmp': 1}
+
+
+def checksum(words, start, end, initial=0):
+    """Function for calculating the internet checksum of a byte range of every header block
+
+    :param words: Array (big-endian uint16) of the header blocks, one row per packet
+    :param start: First byte of the range, even
+    :param end: Byte after the range, the range is padded with a zero byte when its length is odd
+    :param initial: Array or integer of the sum of the pseudo header
+    :return: Array (uint32) of checksums
+
+    """
+    total = words[:, start // 2:(end + 1) // 2].sum(axis=1, dtype=np.uint32) + np.uint32(initial)
+    total = (total & 0xffff) + (total >> 16)
+    total = (total & 0xffff) + (total >> 16)
+    return ~total & 0xffff
+
+
+def make_flows(rng, flows, hosts):
+    """Function for drawing the flows of every protocol
+
+    :param rng: NumPy random generator
+    :param flows: Amount of flows of every protocol
+    :param hosts: Amount of hosts, the hosts are 10.0.0.1 onwards
+    :return: Dictionary of the flow columns (src, dst, sport, dport), one row per protocol and flow
+
+    """
+    src = rng.integers(0, hosts, size=(len(PROTOCOLS), flows))
+    dst = (src + rng.integers(1, hosts, size=src.shape)) % hosts if hosts > 1 else src
+    dport = np.array(list(rng.choice(SERVER_PORTS[name], size=flows) for name in PROTOCOLS))
+    return {'src': 0x0a000001 + src, 'dst': 0x0a000001 + dst,
+            'sport': rng.integers(49152, 65536, size=src.shape), 'dport': dport}
+
+
+def make_packets(rng, count, mix, flows):
+    """Function for drawing the protocol, flow and payload size of every packet
+
+    The packets of a protocol are spread over its flows with a heavy tail: a few flows carry most packets.
+
+    :param rng: NumPy random generator
+    :param count: Amount of packets
+    :param mix: List of the share of every protocol, in the order of PROTOCOLS
+    :param flows: Dictionary of the flow columns from make_flows
+    :return: Dictionary of the packet columns
+
+    """
+    kinds = rng.choice(len(PROTOCOLS), size=count, p=mix)
+    amount = flows['src'].shape[1]
+    weights = 1.0 / np.arange(1, amount + 1)
+    chosen = rng.choice(amount, size=count, p=weights / weights.sum())
+    payload = np.zeros(count, dtype=np.int64)
+    for number, name in enumerate(PROTOCOLS):
+        selected = kinds == number
+        low, high = PAYLOAD_SIZES[name]
+        payload[selected] = rng.integers(low, high + 1, size=int(selected.sum()))
+    header = np.array(list(HEADER_LENGTHS[name] for name in PROTOCOLS))[kinds]
+    packets = dict((column, values[kinds, chosen]) for column, values in flows.items())
+    packets.update({'kind': kinds, 'header': header, 'wirelen': header - 16 + payload})
+    return packets
+
+
+def make_templates():
+    """Function for making the header block of every protocol with the fields that are the same for every packet
+
+    :return: Array (RECORD_DTYPE) of header blocks, in the order of PROTOCOLS
+
+    """
+    templates = np.zeros(len(PROTOCOLS), dtype=RECORD_DTYPE)
+    # Ethernet with locally administered MAC addresses, the rest of the MAC address is the IP address
+    templates['eth_dst_oui'] = 0x0200
+    templates['eth_src_oui'] = 0x0200
+    templates['ethertype'] = 0x0800
+    templates['ip_version'] = 0x45
+    templates['ip_flags'] = 0x4000
+    templates['ip_ttl'] = 64
+    templates['ip_proto'] = list(IP_PROTOCOLS[name] for name in PROTOCOLS)
+    tcp, dns, icmp = (PROTOCOLS.index(name) for name in ('tcp', 'dns', 'icmp'))
+    templates['tcp_flags'][tcp] = 0x5018
+    templates['tcp_window'][tcp] = 65535
+    templates['dns_flags'][dns] = 0x0100
+    templates['dns_questions'][dns] = 1
+    templates['dns_question'][dns] = np.frombuffer(DNS_QUESTION, dtype=np.uint8)
+    templates['icmp_seq'][icmp] = 1
+    return templates
+
+
+TEMPLATES = make_templates()
+
+
+def make_blocks(packets, times):
+    """Function for building the record header and the packet headers of every packet
+
+    :param packets: Dictionary of the packet columns from make_packets
+    :param times: Array (float64) of the timestamps in seconds
+    :return: Array (RECORD_DTYPE) of header blocks, one per packet
+
+    """
+    kinds, src, dst = packets['kind'], packets['src'], packets['dst']
+    blocks = TEMPLATES[kinds]
+    words = blocks.view('>u2').reshape(len(blocks), -1)
+    seconds = np.floor(times)
+    blocks['ts_sec'] = seconds
+    blocks['ts_usec'] = np.minimum(np.round((times - seconds) * 1e6), 999999)
+    blocks['wirelen'] = packets['wirelen']
+    blocks['eth_dst'] = dst
+    blocks['eth_src'] = src
+    length = packets['wirelen'] - 14
+    blocks['ip_length'] = length
+    blocks['ip_id'] = np.arange(len(blocks)) & 0xffff
+    blocks['ip_src'] = src
+    blocks['ip_dst'] = dst
+    blocks['ip_checksum'] = checksum(words, IP_OFFSET, IP_OFFSET + 20)
+    # Transport headers. The payloads are zero bytes, so the checksums only cover the pseudo header and the headers
+    tcp = kinds == PROTOCOLS.index('tcp')
+    dns = kinds == PROTOCOLS.index('dns')
+    udp = (kinds == PROTOCOLS.index('udp')) | dns
+    icmp = kinds == PROTOCOLS.index('icmp')
+    blocks['sport'] = np.where(icmp, 0x0800, packets['sport'])
+    blocks['dport'] = np.where(icmp, 0, packets['dport'])
+    blocks['tcp_seq'][tcp] = np.arange(int(tcp.sum()))
+    blocks['udp_length'][udp] = length[udp] - 20
+    blocks['dns_id'][dns] = np.arange(int(dns.sum())) & 0xffff
+    blocks['icmp_id'][icmp] = np.arange(int(icmp.sum())) & 0xffff
+    pseudo = (src >> 16) + (src & 0xffff) + (dst >> 16) + (dst & 0xffff) + blocks['ip_proto'] + length - 20
+    blocks['tcp_checksum'][tcp] = checksum(words[tcp], TRANSPORT_OFFSET, HEADER_LENGTHS['tcp'], pseudo[tcp])
+    # A UDP checksum of zero means no checksum, so it is sent as 0xffff
+    sums = checksum(words[udp], TRANSPORT_OFFSET, HEADER_LENGTHS['dns'], pseudo[udp])
+    blocks['udp_checksum'][udp] = np.where(sums == 0, 0xffff, sums)
+    blocks['icmp_checksum'][icmp] = checksum(words[icmp], TRANSPORT_OFFSET, HEADER_LENGTHS['icmp'])
+    return blocks
+
+
+def make_records(blocks, header, snaplen):
+    """Function for laying out the header blocks as pcap records with zero byte payloads
+
+    :param blocks: Array (RECORD_DTYPE) of header blocks from make_blocks
+    :param header: Array of the length of the headers (record header included) of every packet
+    :param snaplen: Largest amount of bytes of a packet kept in its record
+    :return: Array (uint8) of the records
+
+    """
+    caplen = np.minimum(blocks['wirelen'], snaplen)
+    blocks['caplen'] = caplen
+    sizes = 16 + caplen.astype(np.int64)
+    offsets = np.concatenate([[0], np.cumsum(sizes[:-1])])
+    records = np.zeros(int(sizes.sum()), dtype=np.uint8)
+    raw = blocks.view(np.uint8).reshape(len(blocks), -1)
+    # Every packet keeps its headers up to the snaplen, so there are only a few distinct lengths to copy
+    kept = np.minimum(header, sizes)
+    for length in np.unique(kept):
+        selected = kept == length
+        records[offsets[selected, None] + np.arange(length)] = raw[selected, :length]
+    return records
+
+
+def make_capture(location, count, mix=None, hosts=50, flows=1000, span=3600.0, snaplen=65535,
+                 start_time=1500000000.0, seed=0):
+    """Function for writing a synthetic pcap-file in bulk
+
+    The headers of every chunk of packets are built as NumPy columns and written at once, no scapy packets are
+    made. Packets are TCP, UDP, DNS queries and ICMP echo requests between the hosts with valid IPv4, TCP, UDP and
+    ICMP checksums and zero byte payloads. With a snaplen smaller than a packet, the record keeps the first snaplen
+    bytes and the length of the whole packet, like a capture made with a snaplen.
+
+    :param location: Location of the pcap-file to write
+    :param count: Amount of packets to write
+    :param mix: Dictionary of protocol ('tcp', 'udp', 'dns', 'icmp') and its share of the packets, defaults to
+                DEFAULT_MIX
+    :param hosts: Amount of hosts sending and receiving the packets
+    :param flows: Amount of flows of every protocol
+    :param span: Seconds between the first and the last packet
+    :param snaplen: Largest amount of bytes of a packet kept in its record
+    :param start_time: Timestamp of the first packet in seconds
+    :param seed: Seed of the random generator, the same seed gives the same capture
+    :return: Size of the written file in bytes
+    :raises ValueError: When the protocol mix is empty or names an unknown protocol
+
+    """
+    mix = dict(DEFAULT_MIX if mix is None else mix)
+    unknown = set(mix) - set(PROTOCOLS)
+    if unknown or sum(mix.values()) <= 0:
+        raise ValueError('Protocol mix has to give a share to tcp, udp, dns or icmp: {}'.format(mix))
+    shares = np.array(list(float(mix.get(name, 0)) for name in PROTOCOLS))
+    shares /= shares.sum()
+    rng = np.random.default_rng(seed)
+    pool = make_flows(rng, flows, hosts)
+    with open(location, 'wb') as f:
+        f.write(struct.pack('<IHHiIII', 0xa1b2c3d4, 2, 4, 0, 0, snaplen, 1))
+        written = 0
+        while written < count:
+            amount = min(CHUNK_PACKETS, count - written)
+            packets = make_packets(rng, amount, shares, pool)
+            # Every chunk covers its share of the time span, with the packets sorted in time
+            first = start_time + span * written / count
+            times = first + np.sort(rng.random(amount)) * span * amount / count
+            blocks = make_blocks(packets, times)
+            f.write(make_records(blocks, packets['header'], snaplen).tobytes())
+            written += amount
+        return f.tell()
+
+
+def parse_mix(values):
+    """Function for parsing a protocol mix given as protocol=share pairs
+
+    :param values: List of strings like 'tcp=60'
+    :return: Dictionary of protocol and share
+    :raises argparse.ArgumentTypeError: When a value is not a protocol=share pair
+
+    """
+    mix = {}
+    for value in values:
+        name, _, share = value.partition('=')
+        try:
+            mix[name.lower()] = float(share)
+        except ValueError:
+            raise argparse.ArgumentTypeError('Expected protocol=share, got ' + value)
+    return mix
+
+
+if __name__ == '__main__':
+    # Run from the project root: python -m benchmark.pcap_generator OUTPUT --count N [--mix tcp=60 udp=20 ...]
+    parser = argparse.ArgumentParser(description='Write a synthetic pcap-file for scale and load tests')
+    parser.add_argument('output', help='pcap-file to write')
+    parser.add_argument('--count', type=int, default=1000000, help='amount of packets')
+    parser.add_argument('--mix', nargs='+', default=list('{}={}'.format(name, share)
+                                                         for name, share in DEFAULT_MIX.items()),
+                        help='share of every protocol as protocol=share (tcp, udp, dns, icmp)')
+    parser.add_argument('--hosts', type=int, default=50, help='amount of hosts')
+    parser.add_argument('--flows', type=int, default=1000, help='amount of flows of every protocol')
+    parser.add_argument('--span', type=float, default=3600.0, help='seconds between the first and last packet')
+    parser.add_argument('--snaplen', type=int, default=65535, help='bytes of every packet kept in the capture')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random generator')
+    args = parser.parse_args()
+    start = time.perf_counter()
+    size = make_capture(args.output, args.count, parse_mix(args.mix), args.hosts, args.flows, args.span,
+                        args.snaplen, seed=args.seed)
+    seconds = time.perf_counter() - start
+    print('Wrote {:,} packets ({:,.0f} MiB) to {} in {:.1f} s ({:,.0f} MiB/s)'.format(
+        args.count, size / 1048576.0, args.output, seconds, size / 1048576.0 / seconds))
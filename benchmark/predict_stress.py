@@ -0,0 +1,79 @@
+try:
+    from controller import controller
+    # Import of Helper libraries
+    import argparse
+    import os
+    import random
+    import sys
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    import pandas as pd
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+
+def get_fields(row):
+    """Function for turning a dataset row into the input values of Controller.predict
+
+    :param row: Row of the dataset in the finaladvice.csv layout
+    :return: Tuple of the input values, in the order of Controller.predict
+
+    """
+    return (row['ModemType'], row['HasRouter'], row['RouterType'], row['RouterSoftware'], row['Subscription'],
+            row['TestUpload'], row['TestDownload'], row['Ping'], row['Processor'], row['NetworkCard'],
+            row['ExternalNIC'], row['ConnectionType'], row['Activities'])
+
+
+def check_rows(instance, rows, expected, requests, seed):
+    """Function for predicting random rows and counting the predictions that differ from the expected ones
+
+    :param instance: Controller with prepared models
+    :param rows: List of input value tuples
+    :param expected: List of the expected predictions of every row
+    :param requests: Amount of predictions to make
+    :param seed: Seed of the random row choice
+    :return: Amount of wrong predictions
+
+    """
+    choice = random.Random(seed)
+    wrong = 0
+    for _ in range(requests):
+        number = choice.randrange(len(rows))
+        if instance.predict(*rows[number]) != expected[number]:
+            wrong += 1
+    return wrong
+
+
+def main():
+    """Function for running the prediction stress test
+
+    The expected predictions of every row of the dataset are made one at a time first. After that many threads
+    predict random rows at the same time and every prediction is compared with the expected one.
+
+    :return: None
+
+    """
+    parser = argparse.ArgumentParser(description='Stress test of the prediction path with many threads')
+    parser.add_argument('--threads', type=int, default=16, help='Amount of threads predicting at the same time')
+    parser.add_argument('--requests', type=int, default=200, help='Amount of predictions per thread')
+    args = parser.parse_args()
+
+    instance = controller.Controller(serve=False)
+    dataset = pd.read_csv(os.getcwd() + instance.config['DEFAULT']['DATASET_PATH'], sep=',')
+    rows = list(get_fields(row) for _, row in dataset.iterrows())
+    expected = list(instance.predict(*fields) for fields in rows)
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        wrong = sum(pool.map(check_rows, [instance] * args.threads, [rows] * args.threads,
+                             [expected] * args.threads, [args.requests] * args.threads, range(args.threads)))
+    seconds = time.time() - start
+    total = args.threads * args.requests
+    print('{} predictions on {} threads in {:.2f} s ({:.0f} predictions/s), {} wrong'.format(
+        total, args.threads, seconds, total / seconds, wrong))
+    if wrong:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+try:
+    from benchmark import pcap_generator, predict_stress
+    from controller import controller
+    from controller import stageMetrics
+    # Import of Helper libraries
+    import argparse
+    import json
+    import mmap
+    import os
+    import platform
+    import random
+    import resource
+    import sys
+    import tempfile
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+    import numpy as np
+    import pandas as pd
+    import sklearn
+    # Import Scapy libraries
+    from scapy.all import rdpcap, PcapReader
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+# Version of the layout of the result file, change it when the layout changes
+RESULT_VERSION = 1
+# Bytes of every packet kept in the synthetic captures (all headers) and seconds between two packets
+SNAPLEN = 96
+PACKET_INTERVAL = 0.001
+
+
+def get_peak_rss():
+    """Function for getting the peak resident set size of this process and its finished child processes
+
+    :return: Peak resident set size in MiB
+
+    """
+    scale = 1024.0 * 1024.0 if sys.platform == 'darwin' else 1024.0
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak / scale
+
+
+def get_percentiles(timings):
+    """Function for summarising a list of latencies
+
+    :param timings: List of latencies in seconds
+    :return: Dictionary with the mean and the p50, p90, p99 and maximum latency in microseconds
+
+    """
+    timings = np.array(timings) * 1e6
+    return {'mean_us': float(np.mean(timings)), 'p50_us': float(np.percentile(timings, 50)),
+            'p90_us': float(np.percentile(timings, 90)), 'p99_us': float(np.percentile(timings, 99)),
+            'max_us': float(np.max(timings))}
+
+
+def time_statistics(path, location, workers):
+    """Function for timing one statistics path on a capture, run in its own process so its peak RSS is its own
+
+    :param path: Name of the path: 'memory', 'stream', 'fast' or 'parallel'
+    :param location: Location of the pcap-file
+    :param workers: Amount of worker processes of the parallel path, 0 uses all cores
+    :return: Tuple of the seconds the path took, the amount of packets in the statistics and the peak RSS in MiB
+
+    """
+    start = time.perf_counter()
+    if path == 'memory':
+        stats = controller.Controller.make_statistics(rdpcap(location), location)
+    elif path == 'stream':
+        reader = PcapReader(location)
+        try:
+            stats = controller.Controller.make_streaming_statistics(reader, location)
+        finally:
+            reader.close()
+    elif path == 'fast':
+        with open(location, 'rb') as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                stats = controller.Controller.make_fast_statistics(buf, location)
+            finally:
+                buf.close()
+    else:
+        stats = controller.Controller.make_parallel_statistics(location, location, workers)
+    seconds = time.perf_counter() - start
+    return seconds, stats.packet_count, get_peak_rss()
+
+
+def run_statistics(sizes, paths, scapy_limit, workers, directory):
+    """Function for timing the statistics paths on synthetic captures of every size
+
+    The scapy paths ('memory' and 'stream') are only timed on captures of at most scapy_limit packets, on larger
+    captures they would take hours (and 'memory' would not fit in memory).
+
+    :param sizes: List of the amounts of packets of the captures
+    :param paths: List of the statistics paths to time
+    :param scapy_limit: Largest capture the scapy paths are timed on
+    :param workers: Amount of worker processes of the parallel path, 0 uses all cores
+    :param directory: Directory to write the captures to
+    :return: List of dictionaries with the results of every size and path
+
+    """
+    results = []
+    for count in sizes:
+        location = os.path.join(directory, 'capture-{}.pcap'.format(count))
+        start = time.perf_counter()
+        pcap_generator.make_capture(location, count, span=count * PACKET_INTERVAL, snaplen=SNAPLEN)
+        print('Made a capture of {:,} packets ({:,.0f} MiB) in {:.1f} s'.format(
+            count, os.path.getsize(location) / 1048576.0, time.perf_counter() - start))
+        for path in paths:
+            if path in ('memory', 'stream') and count > scapy_limit:
+                continue
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                seconds, packets, peak = pool.submit(time_statistics, path, location, workers).result()
+            if packets != count:
+                raise ValueError('The {} path counted {} of {} packets'.format(path, packets, count))
+            results.append({'packets': count, 'path': path, 'seconds': seconds,
+                            'packets_per_second': count / seconds, 'peak_rss_mib': peak})
+            print('{:>12,} {:<8} {:>10.3f} s {:>14,.0f} packets/s {:>10.1f} MiB'.format(
+                count, path, seconds, count / seconds, peak))
+        os.remove(location)
+    return results
+
+
+class StepMetrics(stageMetrics.StageMetrics):
+    """Step metrics class
+
+    Metrics registry that keeps every latency of the prediction stages instead of a histogram, so the stages
+    timed inside Controller.predict can be summarised as percentiles.
+
+    """
+
+    def __init__(self):
+        """Constructor method for making an enabled registry that keeps every latency
+
+        """
+        super().__init__(enabled=True)
+        self.latencies = {}
+
+    def observe(self, stage, seconds):
+        """Method for keeping one latency of a stage
+
+        :param stage: Name of the stage
+        :param seconds: Latency in seconds
+        :return: None
+
+        """
+        with self.lock:
+            self.latencies.setdefault(stage, []).append(seconds)
+
+
+def run_prediction(instance, rows, repeats):
+    """Function for timing predictions the way the demo page makes them, with Controller.predict
+
+    The total is the latency of Controller.predict. The encoding and the prediction of every model are the stages
+    Controller.predict records in the stage metrics, recorded here while the predictions are timed.
+
+    :param instance: Controller with prepared models
+    :param rows: List of input value tuples, in the order of Controller.predict
+    :param repeats: Amount of rows to time
+    :return: Dictionary with the latency percentiles of every step and of the whole prediction
+
+    """
+    steps = ('encode', 'kmodes', 'kmeans', 'nb_model', 'rf_model', 'total')
+    registry = stageMetrics.REGISTRY
+    stageMetrics.REGISTRY = StepMetrics()
+    try:
+        total = []
+        for number in range(repeats):
+            start = time.perf_counter()
+            instance.predict(*rows[number % len(rows)])
+            total.append(time.perf_counter() - start)
+        latencies = stageMetrics.REGISTRY.latencies
+    finally:
+        stageMetrics.REGISTRY = registry
+    timings = dict((step, latencies.get('predict_' + step, [])) for step in steps)
+    timings['encode'] = latencies.get('encode', [])
+    timings['total'] = total
+    results = dict((step, get_percentiles(timings[step])) for step in steps if timings[step])
+    for step in steps:
+        if step in results:
+            print('{:<8} p50 {:>10.1f} us p99 {:>10.1f} us'.format(step, results[step]['p50_us'],
+                                                                    results[step]['p99_us']))
+    return results
+
+
+def run_training(instance, repeats):
+    """Function for timing the training of all models
+
+    :param instance: Controller with prepared datasets
+    :param repeats: Amount of times to train the models
+    :return: Dictionary with the seconds of every training run and the seconds of every model in the fastest run
+
+    """
+    runs = []
+    models = {}
+    for _ in range(repeats):
+        start = time.perf_counter()
+        instance.train_models()
+        runs.append(time.perf_counter() - start)
+        if runs[-1] == min(runs):
+            models = dict(instance.training_times)
+    return {'seconds': runs, 'best_seconds': min(runs), 'models': models}
+
+
+def compare(baseline, results):
+    """Function for printing the speedup of every measurement over a baseline result file
+
+    :param baseline: Dictionary of an earlier result file
+    :param results: Dictionary of this run
+    :return: None
+
+    """
+    before = dict(((entry['packets'], entry['path']), entry) for entry in baseline.get('statistics', []))
+    for entry in results['statistics']:
+        old = before.get((entry['packets'], entry['path']))
+        if old is not None:
+            print('{:>12,} {:<8} {:>6.2f}x packets/s'.format(entry['packets'], entry['path'],
+                                                            entry['packets_per_second'] / old['packets_per_second']))
+    for step, latency in results.get('prediction', {}).items():
+        old = baseline.get('prediction', {}).get(step)
+        if old is not None:
+            print('{:<21} {:>6.2f}x p50 latency'.format(step, old['p50_us'] / latency['p50_us']))
+    if 'training' in results and 'training' in baseline:
+        print('{:<21} {:>6.2f}x training time'.format('training', baseline['training']['best_seconds'] /
+                                                      results['training']['best_seconds']))
+
+
+def main():
+    """Function for running the benchmark suite
+
+    All captures are synthetic and the models are trained on the local dataset, so no network access is needed.
+    The results are written as JSON, optionally compared with an earlier result file.
+
+    :return: None
+
+    """
+    parser = argparse.ArgumentParser(description='Benchmark suite of the capture and prediction hot paths')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 1000000, 10000000],
+                        help='amounts of packets of the synthetic captures')
+    parser.add_argument('--paths', nargs='+', default=['memory', 'stream', 'fast', 'parallel'],
+                        choices=['memory', 'stream', 'fast', 'parallel'], help='statistics paths to time')
+    parser.add_argument('--scapy-limit', type=int, default=100000,
+                        help='largest capture the scapy paths (memory and stream) are timed on')
+    parser.add_argument('--workers', type=int, default=0, help='worker processes of the parallel path, 0 uses all')
+    parser.add_argument('--predictions', type=int, default=2000, help='amount of predictions to time')
+    parser.add_argument('--trainings', type=int, default=3, help='amount of times to train the models')
+    parser.add_argument('--output', default='benchmark.json', help='JSON file to write the results to')
+    parser.add_argument('--baseline', help='JSON file of an earlier run to compare the results with')
+    args = parser.parse_args()
+
+    results = {'version': RESULT_VERSION, 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                               'cpu_count': os.cpu_count(), 'numpy': np.__version__, 'pandas': pd.__version__,
+                               'sklearn': sklearn.__version__}}
+    with tempfile.TemporaryDirectory() as directory:
+        results['statistics'] = run_statistics(args.sizes, args.paths, args.scapy_limit, args.workers, directory)
+    instance = controller.Controller(serve=False)
+    dataset = pd.read_csv(os.getcwd() + instance.config['DEFAULT']['DATASET_PATH'], sep=',')
+    rows = list(predict_stress.get_fields(row) for _, row in dataset.iterrows())
+    random.Random(1).shuffle(rows)
+    results['prediction'] = run_prediction(instance, rows, args.predictions)
+    results['training'] = run_training(instance, args.trainings)
+    results['peak_rss_mib'] = get_peak_rss()
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print('Results written to ' + args.output)
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            compare(json.load(f), results)
+
+
+if __name__ == '__main__':
+    # Run from the project root: python -m benchmark.suite [--sizes N ...] [--output FILE] [--baseline FILE]
+    main()
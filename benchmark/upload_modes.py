@@ -0,0 +1,105 @@
+try:
+    from benchmark import mode_consistency
+    from benchmark import pcap_generator
+    from controller import controller
+    # Import of Helper libraries
+    import argparse
+    import base64
+    import json
+    import os
+    import sys
+    import tempfile
+    # Import Scapy libraries
+    from scapy.all import PcapReader, PcapNgWriter
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+PCAP_MODES = ('memory', 'stream', 'fast', 'indexed', 'parallel')
+
+
+def write_pcapng(location, pcapng_location):
+    """Function for writing the packets of a pcap-file as pcapng-file
+
+    :param location: Location of the pcap-file
+    :param pcapng_location: Location of the pcapng-file to write
+    :return: None
+
+    """
+    reader = PcapReader(location)
+    writer = PcapNgWriter(pcapng_location)
+    try:
+        for pkt in reader:
+            writer.write(pkt)
+    finally:
+        writer.close()
+        reader.close()
+
+
+def make_controller(mode, spool_bytes, workers):
+    """Function for making a controller that only analyses uploads, without models or statistics cache
+
+    :param mode: PCAP_MODE of the controller
+    :param spool_bytes: UPLOAD_SPOOL_BYTES of the controller
+    :param workers: PCAP_WORKERS of the controller
+    :return: Controller instance
+
+    """
+    instance = controller.Controller.__new__(controller.Controller)
+    with open('config.json', 'r') as f:
+        instance.config = json.load(f)
+    instance.config['DEFAULT'].update({'PCAP_MODE': mode, 'UPLOAD_SPOOL_BYTES': spool_bytes, 'PCAP_WORKERS': workers,
+                                       'PARALLEL_MIN_BYTES': 0})
+    return instance
+
+
+def main():
+    """Function for checking that uploads give the same statistics in every PCAP_MODE
+
+    A synthetic capture is uploaded as pcap-file and as pcapng-file, kept in memory (below UPLOAD_SPOOL_BYTES) and
+    spooled to a temporary file (above it), in every mode. The command fails when an upload gives an error or a
+    value differs from the first upload.
+
+    :return: None
+
+    """
+    parser = argparse.ArgumentParser(description='Check that uploads give the same statistics in every pcap mode')
+    parser.add_argument('--count', type=int, default=5000, help='amount of packets of the synthetic capture')
+    parser.add_argument('--workers', type=int, default=2, help='worker processes of the parallel mode')
+    parser.add_argument('--modes', nargs='+', default=list(PCAP_MODES), choices=PCAP_MODES, help='modes to check')
+    args = parser.parse_args()
+
+    uploads = {}
+    with tempfile.TemporaryDirectory() as directory:
+        location = os.path.join(directory, 'capture.pcap')
+        pcap_generator.make_capture(location, args.count)
+        write_pcapng(location, os.path.join(directory, 'capture.pcapng'))
+        for name in ('capture.pcap', 'capture.pcapng'):
+            with open(os.path.join(directory, name), 'rb') as f:
+                uploads[name] = 'data:application/octet-stream;base64,' + base64.b64encode(f.read()).decode()
+    expected = None
+    failures = 0
+    for name, contents in uploads.items():
+        for tier, spool_bytes in (('memory', len(contents)), ('temporary file', 0)):
+            for mode in args.modes:
+                stats = make_controller(mode, spool_bytes, args.workers).parse_contents(contents, name)
+                label = '{} in {} with {}'.format(name, tier, mode)
+                if isinstance(stats, str):
+                    failures += 1
+                    print('{}: {}'.format(label, stats))
+                    continue
+                summary = mode_consistency.get_summary(stats)
+                if expected is None:
+                    expected = summary
+                for value_name, value in summary.items():
+                    if value != expected[value_name]:
+                        failures += 1
+                        print('{}: {} differs'.format(label, value_name))
+    print('{} uploads, {} failures'.format(len(uploads) * 2 * len(args.modes), failures))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    # Run from the project root: python -m benchmark.upload_modes [--count N] [--modes MODE ...]
+    main()
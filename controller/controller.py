@@ -2,28 +2,47 @@ try:
     from view import gui as gui
     from model import unseenInstance
     from model import statsModel
+    from controller import pcapStatistics
+    from controller import pcapDecoder
+    from controller import pcapIndex
+    from controller import uploadBuffer
+    from controller import statsCache
+    from controller import modelStore
+    from controller import trainingScheduler
+    from controller import stageMetrics
+    from controller import lazyImport
     # Import of Helper libraries
     import os
-    import pandas as pd
+    import copy
+    import mmap
+    import time
+    import threading
+    from concurrent.futures import ProcessPoolExecutor
     import numpy as np
     import json
+    # Libraries that take long to import are imported on first use, so the app server starts without them
+    pd = lazyImport.LazyModule('pandas')
+    # Modules that import pandas and scikit-learn themselves
+    metricsModel = lazyImport.LazyModule('model.metricsModel')
+    featureEncoder = lazyImport.LazyModule('model.featureEncoder')
+    datasetLoader = lazyImport.LazyModule('controller.datasetLoader')
     # Import Scapy libraries
-    from scapy.layers.dns import DNS
-    from scapy.layers.inet import IP, ICMP, UDP, TCP, Ether
-    from scapy.all import *
+    scapy = lazyImport.LazyModule('scapy.all')
+    inet = lazyImport.LazyModule('scapy.layers.inet')
+    inet6 = lazyImport.LazyModule('scapy.layers.inet6')
+    dns = lazyImport.LazyModule('scapy.layers.dns')
     # Import Library of KModes clustering
-    from kmodes.kmodes import KModes
+    kmodes_library = lazyImport.LazyModule('kmodes.kmodes')
     # Import Library of KMeans clustering
-    from sklearn.cluster import KMeans
+    cluster = lazyImport.LazyModule('sklearn.cluster')
     # Import Library of Gaussian Naive Bayes classification
-    from sklearn.naive_bayes import GaussianNB
+    naive_bayes = lazyImport.LazyModule('sklearn.naive_bayes')
     # Import Library of Random Forest classification
-    from sklearn.ensemble import RandomForestClassifier
+    ensemble = lazyImport.LazyModule('sklearn.ensemble')
     # Import Sklearn Helper libraries
-    from sklearn.metrics import accuracy_score
-    from sklearn.metrics import confusion_matrix
-    from sklearn import preprocessing
-    from sklearn.model_selection import train_test_split
+    preprocessing = lazyImport.LazyModule('sklearn.preprocessing')
+    base = lazyImport.LazyModule('sklearn.base')
+    model_selection = lazyImport.LazyModule('sklearn.model_selection')
 except ImportError as e:
     print("Libraries are not installed: " + e.__str__())
     exit()
@@ -42,24 +61,58 @@ class Controller:
     ul_dataset = ""
     sl_dataset = ""
     config = ""
-    # Machine learning algorithms
-    kmodes = KModes(n_clusters=5, init='Huang', n_init=5, verbose=1)
-    nb_model = GaussianNB()
-    rf_model = RandomForestClassifier(n_estimators=100, oob_score=True,
-                                      random_state=15425)
-    kmeans = KMeans(n_clusters=5, random_state=241)
-    # All encoders
-    advice_encoder = preprocessing.LabelEncoder()
-    activities_encoder = preprocessing.LabelEncoder()
-    has_router_encoder = preprocessing.LabelEncoder()
-    modem_type_encoder = preprocessing.LabelEncoder()
-    router_type_encoder = preprocessing.LabelEncoder()
-    router_firmware_encoder = preprocessing.LabelEncoder()
-    subscription_encoder = preprocessing.LabelEncoder()
-    connection_encoder = preprocessing.LabelEncoder()
-    network_card_encoder = preprocessing.LabelEncoder()
-    has_external_encoder = preprocessing.LabelEncoder()
-    processor_encoder = preprocessing.LabelEncoder()
+    stats_cache = None
+    model_store = None
+    model_key = ""
+    model_ready = {}
+    metrics = {}
+    training_times = {}
+    model_lock = None
+    ingest_lock = None
+    pending_batches = None
+    kmeans_counts = None
+    refit_thread = None
+    training_thread = None
+    # Machine learning algorithms, made by create_models
+    kmodes = None
+    nb_model = None
+    rf_model = None
+    kmeans = None
+    # All encoders, made by create_models
+    advice_encoder = None
+    activities_encoder = None
+    has_router_encoder = None
+    modem_type_encoder = None
+    router_type_encoder = None
+    router_firmware_encoder = None
+    subscription_encoder = None
+    connection_encoder = None
+    network_card_encoder = None
+    has_external_encoder = None
+    processor_encoder = None
+    # Names of the parts that have to be ready before predicting: the encoders and the four models
+    readiness_names = ('encoders', 'kmodes', 'kmeans', 'nb_model', 'rf_model')
+    # Names of the classification models, which get metrics
+    metrics_names = ('nb_model', 'rf_model')
+    # Names of the fitted models and encoders kept in the model store
+    artifact_names = ('kmodes', 'nb_model', 'rf_model', 'kmeans', 'advice_encoder', 'activities_encoder',
+                      'has_router_encoder', 'modem_type_encoder', 'router_type_encoder', 'router_firmware_encoder',
+                      'subscription_encoder', 'connection_encoder', 'network_card_encoder', 'has_external_encoder',
+                      'processor_encoder', 'feature_encoder', 'metrics')
+    # Encoder of every categorical column of the dataset
+    column_encoders = {'ModemType': 'modem_type_encoder', 'HasRouter': 'has_router_encoder',
+                       'RouterType': 'router_type_encoder', 'RouterSoftware': 'router_firmware_encoder',
+                       'Subscription': 'subscription_encoder', 'ConnectionType': 'connection_encoder',
+                       'NetworkCard': 'network_card_encoder', 'ExternalNIC': 'has_external_encoder',
+                       'Processor': 'processor_encoder', 'Activities': 'activities_encoder'}
+    # Column of every categorical field of the unseen instance
+    instance_columns = {'modem_type': 'ModemType', 'has_router': 'HasRouter', 'router_type': 'RouterType',
+                        'router_firmware': 'RouterSoftware', 'subscription': 'Subscription',
+                        'connection': 'ConnectionType', 'network_card': 'NetworkCard', 'has_pcicard': 'ExternalNIC',
+                        'processor_type': 'Processor', 'activity': 'Activities'}
+    # Columns of the dataset used as input of the models, in training order
+    feature_columns = []
+    feature_encoder = None
     # Training datasets (values and labels)
     train_values = []
     train_labels = []
@@ -67,25 +120,91 @@ class Controller:
     test_values = []
     test_labels = []
 
-    def __init__(self):
+    def __init__(self, serve=True):
         """Init method
 
-        Making a new GUI instance, preparing data for machine learning and starting the app server.
+        Making a new GUI instance, preparing data for machine learning and starting the app server. With the
+        background training mode the app server starts at once and the models are prepared in a background thread.
+
+        :param serve: False for a headless controller (batch predictions), which only prepares the models
 
         """
         with open('config.json', 'r') as f:
             self.config = json.load(f)
+        stageMetrics.REGISTRY.enabled = self.config['DEFAULT'].get('STAGE_METRICS', False)
+        if self.config['DEFAULT'].get('STATS_CACHE', False):
+            self.stats_cache = statsCache.StatsCache(os.getcwd() + self.config['DEFAULT']['STATS_CACHE_PATH'],
+                                                     self.config['DEFAULT']['STATS_CACHE_MEMORY_BYTES'],
+                                                     self.config['DEFAULT']['STATS_CACHE_DISK_BYTES'])
+        if self.config['DEFAULT'].get('MODEL_STORE', False):
+            self.model_store = modelStore.ModelStore(os.getcwd() + self.config['DEFAULT']['MODEL_STORE_PATH'])
+        self.model_ready = dict((name, threading.Event()) for name in self.readiness_names)
+        self.metrics = {}
+        self.training_times = {}
+        self.model_lock = threading.Lock()
+        self.ingest_lock = threading.Lock()
+        self.pending_batches = []
+        if not serve:
+            self.prepare_models()
+            return
         self.gui = gui.Gui(self)
-        self.make_unsupervised_set()
-        self.make_supervised_set()
+        if self.config['DEFAULT'].get('TRAINING_MODE', 'foreground') == 'background':
+            self.training_thread = threading.Thread(target=self.prepare_models, name='training', daemon=True)
+            self.training_thread.start()
+        else:
+            self.prepare_models()
+        self.gui.app.run_server(debug=False, host='0.0.0.0')
+
+    def prepare_models(self):
+        """Method for preparing the datasets and loading or training all models
+
+        Every model is marked as ready as soon as it is trained, so it can be used while the other models train.
+
+        :return: None
+
+        """
+        self.create_models()
+        self.load_dataset()
         self.create_datasets()
-        self.train_kmodes()
-        self.train_kmeans()
-        self.train_bayes()
-        self.train_random_forest()
+        self.model_ready['encoders'].set()
+        if self.load_models():
+            for event in self.model_ready.values():
+                event.set()
+        else:
+            self.train_models()
+            self.save_models()
         self.get_bayes_confmatrix()
         self.get_rf_confmatrix()
-        self.gui.app.run_server(debug=False, host='0.0.0.0')
+        if self.config['DEFAULT'].get('INGEST_REFIT_SECONDS', 0) > 0:
+            self.refit_thread = threading.Thread(target=self.refit_loop, name='refit', daemon=True)
+            self.refit_thread.start()
+
+    def create_models(self):
+        """Method for making the untrained models and the encoders
+
+        The models are made here instead of in the class body, so scikit-learn and kmodes are only imported by the
+        thread that prepares the models and not when the controller is imported.
+
+        :return: None
+
+        """
+        self.kmodes = kmodes_library.KModes(n_clusters=5, init='Huang', n_init=5, verbose=1)
+        self.nb_model = naive_bayes.GaussianNB()
+        self.rf_model = ensemble.RandomForestClassifier(n_estimators=100, oob_score=True,
+                                                        random_state=15425)
+        self.kmeans = cluster.KMeans(n_clusters=5, random_state=241)
+        for name in list(self.column_encoders.values()) + ['advice_encoder']:
+            setattr(self, name, preprocessing.LabelEncoder())
+
+    def is_ready(self, name):
+        """Method for checking if a model can be used for predictions
+
+        :param name: Name of the model as in readiness_names, 'encoders' for the encoders of the unseen instance
+        :return: True when the model is trained or loaded
+
+        """
+        event = self.model_ready.get(name)
+        return event is not None and event.is_set()
 
     def create_unseen_instance(self, modem_type, has_router, router_type, router_firmware,
                                subscription, test_upload, test_download, test_ping, processor_type,
@@ -117,95 +236,391 @@ class Controller:
     def parse_filename(self, filename):
         """Method for loading pcap-file and loading the file
 
+        Statistics of captures that were analysed before are taken from the statistics cache, other captures are
+        analysed with analyse_file and added to the cache.
+
         :param filename: Name of the chosen pcap-file
         :return: Statistics Model instance
 
         """
         try:
-            location = os.getcwd()
-            packets = rdpcap(location + self.config['DEFAULT']['RES_PATH'] + filename)
+            with stageMetrics.REGISTRY.time('parse_file'):
+                location = os.getcwd() + self.config['DEFAULT']['RES_PATH'] + filename
+                if self.stats_cache is None:
+                    return self.count_capture(self.analyse_file(location, filename))
+                with stageMetrics.REGISTRY.time('stats_cache'):
+                    key = self.stats_cache.key_for_file(location)
+                    stats = self.stats_cache.get(key, filename)
+                if stats is None:
+                    stats = self.count_capture(self.analyse_file(location, filename))
+                    self.stats_cache.put(key, stats)
+                else:
+                    stageMetrics.REGISTRY.count('stats_cache_hits')
+                return stats
+        except Exception:
+            return 'An error occurred while uploading'
+
+    @staticmethod
+    def count_capture(stats):
+        """Method for counting an analysed capture and its packets in the stage metrics
+
+        :param stats: Statistics Model instance of the capture
+        :return: The same Statistics Model instance
+
+        """
+        stageMetrics.REGISTRY.count('pcap_files')
+        stageMetrics.REGISTRY.count('pcap_packets', stats.packet_count)
+        return stats
+
+    def analyse_file(self, location, filename):
+        """Method for calculating the statistics of a pcap-file
+
+        The PCAP_MODE setting in the config decides how the file is read: 'memory' loads all packets at once,
+        'stream' reads them one by one so memory use does not grow with the size of the capture and 'fast' decodes
+        the raw bytes without scapy, falling back to 'stream' for files the raw decoder does not support.
+        'parallel' works like 'fast', but spreads files of at least PARALLEL_MIN_BYTES over PCAP_WORKERS processes.
+        With PCAP_INDEX enabled the raw decoder keeps a record index next to the file, so a capture that was
+        analysed before is decoded without walking its record headers again.
+
+        :param location: Location of the pcap-file
+        :param filename: Name of the chosen pcap-file
+        :return: Statistics Model instance
+
+        """
+        mode = self.config['DEFAULT'].get('PCAP_MODE', 'fast')
+        if mode == 'memory':
+            # Scapy dissects every packet while reading the file
+            with stageMetrics.REGISTRY.time('pcap_dissect'):
+                packets = scapy.rdpcap(location)
             return self.make_statistics(packets, filename)
+        if mode == 'fast' or mode == 'parallel':
+            with open(location, 'rb') as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    if pcapDecoder.is_supported(buf):
+                        index = None
+                        if self.config['DEFAULT'].get('PCAP_INDEX', False):
+                            with stageMetrics.REGISTRY.time('pcap_read'):
+                                index = pcapIndex.PcapIndex.open(location)
+                        try:
+                            if mode == 'parallel' and len(buf) >= self.config['DEFAULT']['PARALLEL_MIN_BYTES']:
+                                return self.make_parallel_statistics(location, filename,
+                                                                     self.config['DEFAULT']['PCAP_WORKERS'],
+                                                                     index)
+                            if index is not None:
+                                return self.make_indexed_statistics(index, filename)
+                            return self.make_fast_statistics(buf, filename)
+                        finally:
+                            if index is not None:
+                                index.close()
+                finally:
+                    buf.close()
+        reader = scapy.PcapReader(location)
+        try:
+            return self.make_streaming_statistics(reader, filename)
+        finally:
+            reader.close()
+
+    # noinspection PyBroadException
+    def parse_contents(self, contents, filename):
+        """Method for calculating the statistics of an uploaded pcap-file straight from the upload contents
+
+        The base64 contents are decoded into a spooled buffer: small uploads stay in memory, uploads larger than
+        UPLOAD_SPOOL_BYTES are written to a temporary file. The buffer is looked up in the statistics cache or
+        analysed with the same PCAP_MODE rules as parse_filename, without the file having to be in the resource
+        folder.
+
+        :param contents: Contents of the upload component as base64 data URI
+        :param filename: Name of the uploaded pcap-file
+        :return: Statistics Model instance
+
+        """
+        try:
+            with stageMetrics.REGISTRY.time('parse_upload'):
+                with stageMetrics.REGISTRY.time('pcap_read'):
+                    upload = uploadBuffer.UploadBuffer(contents, self.config['DEFAULT']['UPLOAD_SPOOL_BYTES'])
+                try:
+                    if self.stats_cache is None:
+                        return self.count_capture(self.analyse_upload(upload, filename))
+                    with stageMetrics.REGISTRY.time('stats_cache'):
+                        key = self.stats_cache.key_for_buffer(upload.buf)
+                        stats = self.stats_cache.get(key, filename)
+                    if stats is None:
+                        stats = self.count_capture(self.analyse_upload(upload, filename))
+                        self.stats_cache.put(key, stats)
+                    else:
+                        stageMetrics.REGISTRY.count('stats_cache_hits')
+                    return stats
+                finally:
+                    upload.close()
         except Exception:
             return 'An error occurred while uploading'
 
+    def analyse_upload(self, upload, filename):
+        """Method for calculating the statistics of an upload buffer
+
+        :param upload: UploadBuffer holding the decoded upload
+        :param filename: Name of the uploaded pcap-file
+        :return: Statistics Model instance
+
+        """
+        mode = self.config['DEFAULT'].get('PCAP_MODE', 'fast')
+        if mode == 'memory':
+            with stageMetrics.REGISTRY.time('pcap_dissect'):
+                with upload.open_file() as file:
+                    packets = scapy.rdpcap(file)
+            return self.make_statistics(packets, filename)
+        if (mode == 'fast' or mode == 'parallel') and pcapDecoder.is_supported(upload.buf):
+            if mode == 'parallel' and upload.location is not None and \
+                    len(upload) >= self.config['DEFAULT']['PARALLEL_MIN_BYTES']:
+                return self.make_parallel_statistics(upload.location, filename,
+                                                     self.config['DEFAULT']['PCAP_WORKERS'])
+            return self.make_fast_statistics(upload.buf, filename)
+        reader = scapy.PcapReader(upload.open_file())
+        try:
+            return self.make_streaming_statistics(reader, filename)
+        finally:
+            reader.close()
+
     @staticmethod
     def make_statistics(packets, filename):
         """Method for loading pcap-file, calculating statistical
         values and making statistics model instance for displaying on the statistical overview page
 
+        The loaded packets are added to a statistics accumulator the same way as in the streaming mode, so both modes
+        give the same statistics.
+
         :param filename: Filename of the loaded pcap file
         :param packets: Loaded pcap file instance
         :return: Statistical Model instance
 
         """
-        # Make packet counts
-        tcp_count = packets[TCP].__len__()
-        udp_count = packets[UDP].__len__()
-        dns_count = packets[DNS].__len__()
-        icmp_count = packets[ICMP].__len__()
-        # Make address lists
-        source_addresses = list(p[IP].src for p in packets if IP in p)
-        destination_addresses = list(p[IP].dst for p in packets if IP in p)
-        # Calculate protocols used
-        protocols_used = list(p[IP].get_field('proto').i2s[p.proto] for p in packets if IP in p)
-        # Make unique address lists
-        unique_source_addresses = set(source_addresses)
-        unique_destination_addresses = set(destination_addresses)
-        # Calculate total session time
-        total_time = packets[packets.__len__()-1].time - packets[0].time
-        # Make empty variables
-        total_throughput = 0
-        sent_bytes = []
-        time_list = []
-        # For-loop for calculating values
+        start = time.perf_counter()
+        layers = Controller.get_scapy_layers()
+        accumulator = pcapStatistics.StatsAccumulator()
         for pkt in packets:
-            if Ether in pkt:
-                time_list.append(pkt[Ether].time - packets[0].time)
-                sent_bytes.append(total_throughput)
-                total_throughput += pkt[Ether].wirelen
-        stats_model = statsModel.StatsInstance(tcp_count, udp_count, dns_count, icmp_count,
-                                               source_addresses, destination_addresses,
-                                               unique_source_addresses, unique_destination_addresses,
-                                               sent_bytes, time_list, protocols_used, total_time, filename)
+            Controller.add_scapy_packet(accumulator, pkt, layers)
+        stats_model = accumulator.to_stats_instance(filename)
+        stageMetrics.REGISTRY.observe('pcap_aggregate', time.perf_counter() - start)
         return stats_model
 
-    def make_unsupervised_set(self):
-        """Method for preparing unsupervised learning dataset to train kmodes and kmeans models
+    @staticmethod
+    def make_streaming_statistics(packets, filename):
+        """Method for calculating statistical values in a single pass over a packet reader
+
+        Every packet is dissected, added to a statistics accumulator and then dropped, so only the values
+        needed for the statistics page and the flow table are kept in memory.
 
+        :param packets: Iterable of packets, for example a scapy PcapReader
+        :param filename: Filename of the loaded pcap file
+        :return: Statistical Model instance
+
+        """
+        layers = Controller.get_scapy_layers()
+        dissect = stageMetrics.REGISTRY.timer('pcap_dissect')
+        aggregate = stageMetrics.REGISTRY.timer('pcap_aggregate')
+        accumulator = pcapStatistics.StatsAccumulator()
+        for pkt in dissect.iterate(packets):
+            with aggregate:
+                Controller.add_scapy_packet(accumulator, pkt, layers)
+        with aggregate:
+            stats = accumulator.to_stats_instance(filename)
+        dissect.record()
+        aggregate.record()
+        return stats
+
+    @staticmethod
+    def get_scapy_layers():
+        """Getter method for the scapy layer classes used by add_scapy_packet
+
+        :return: Tuple of the IP, IPv6, TCP, UDP, DNS, ICMP and Ether layer classes
+
+        """
+        return inet.IP, inet6.IPv6, inet.TCP, inet.UDP, dns.DNS, inet.ICMP, inet.Ether
+
+    @staticmethod
+    def add_scapy_packet(accumulator, pkt, layers):
+        """Method for adding the values of a dissected scapy packet to a statistics accumulator
+
+        :param accumulator: StatsAccumulator to add the packet to
+        :param pkt: Scapy packet
+        :param layers: Tuple of the layer classes made by get_scapy_layers
         :return: None
 
         """
-        self.ul_dataset = pd.read_csv(os.getcwd() + self.config['DEFAULT']['DATASET_PATH'], sep=',')
-        self.ul_dataset = self.ul_dataset.drop('Advice', 1)
-        self.ul_dataset["ModemType"] = self.ul_dataset["ModemType"].astype('category')
-        self.ul_dataset["HasRouter"] = self.ul_dataset["HasRouter"].astype('category')
-        self.ul_dataset["RouterType"] = self.ul_dataset["RouterType"].astype('category')
-        self.ul_dataset["Subscription"] = self.ul_dataset["Subscription"].astype('category')
-        self.ul_dataset["ConnectionType"] = self.ul_dataset["ConnectionType"].astype('category')
-        self.ul_dataset["NetworkCard"] = self.ul_dataset["NetworkCard"].astype('category')
-        self.ul_dataset["ExternalNIC"] = self.ul_dataset["ExternalNIC"].astype('category')
-        self.ul_dataset["Processor"] = self.ul_dataset["Processor"].astype('category')
-        self.ul_dataset["Activities"] = self.ul_dataset["Activities"].astype('category')
-        self.ul_dataset["RouterSoftware"] = self.ul_dataset["RouterSoftware"].astype('category')
+        IP, IPv6, TCP, UDP, DNS, ICMP, Ether = layers
+        wirelen = pkt[Ether].wirelen if Ether in pkt else None
+        if IP in pkt:
+            ip = pkt[IP]
+            src, dst = ip.src, ip.dst
+            proto = ip.get_field('proto').i2s.get(ip.proto, str(ip.proto))
+        else:
+            src, dst, proto = None, None, None
+        flow = None
+        if IP in pkt or IPv6 in pkt:
+            network = pkt[IP] if IP in pkt else pkt[IPv6]
+            transport = pkt[TCP] if TCP in pkt else pkt[UDP] if UDP in pkt else None
+            number = 6 if TCP in pkt else 17 if UDP in pkt else network.proto if IP in pkt else network.nh
+            ports = (transport.sport, transport.dport) if transport is not None else (0, 0)
+            flow = (network.src, network.dst) + ports + (number, pkt.wirelen or len(pkt))
+        accumulator.add_packet(float(pkt.time), wirelen, src, dst, proto,
+                               TCP in pkt, UDP in pkt, DNS in pkt, ICMP in pkt, flow)
 
-    def make_supervised_set(self):
-        """Method for preparing supervised learning dataset to train naive bayes and random forest models
+    @staticmethod
+    def make_fast_statistics(buf, filename):
+        """Method for calculating statistical values with the raw pcap decoder
+
+        The headers are decoded straight from the bytes of the file in batches of NumPy columns, no scapy
+        packets are made.
+
+        :param buf: Buffer (bytes, mmap) containing the pcap-file
+        :param filename: Filename of the loaded pcap file
+        :return: Statistical Model instance
+
+        """
+        return Controller.accumulate_batches(pcapDecoder.iter_batches(buf), filename)
+
+    @staticmethod
+    def make_indexed_statistics(index, filename, records=None):
+        """Method for calculating statistical values with the raw pcap decoder and a record index
+
+        :param index: PcapIndex of the pcap-file
+        :param filename: Filename of the loaded pcap file
+        :param records: Array of record numbers to include, defaults to all records
+        :return: Statistical Model instance
+
+        """
+        return Controller.accumulate_batches(index.iter_batches(records), filename)
+
+    @staticmethod
+    def accumulate_batches(batches, filename):
+        """Method for calculating statistical values from the batches of the raw pcap decoder
+
+        :param batches: Iterable of batches of NumPy columns, decoded while iterating
+        :param filename: Filename of the loaded pcap file
+        :return: Statistical Model instance
+
+        """
+        dissect = stageMetrics.REGISTRY.timer('pcap_dissect')
+        aggregate = stageMetrics.REGISTRY.timer('pcap_aggregate')
+        accumulator = pcapStatistics.StatsAccumulator()
+        for batch in dissect.iterate(batches):
+            with aggregate:
+                accumulator.add_batch(batch)
+        with aggregate:
+            stats = accumulator.to_stats_instance(filename)
+        dissect.record()
+        aggregate.record()
+        return stats
+
+    @staticmethod
+    def make_parallel_statistics(location, filename, workers=0, index=None):
+        """Method for calculating statistical values with the raw pcap decoder on several processes
+
+        The file is split into record-aligned byte ranges. Every range is decoded by a worker process into a
+        partial statistics accumulator, after which the partial results are merged in file order. The method is
+        called from the threads of the app server, so the workers are not forked, see trainingScheduler.get_context.
+
+        :param location: Location of the pcap-file
+        :param filename: Filename of the loaded pcap file
+        :param workers: Amount of worker processes, 0 uses all cores
+        :param index: PcapIndex of the file, used to split the file without searching for record boundaries
+        :return: Statistical Model instance
+
+        """
+        workers = workers or os.cpu_count()
+        if index is not None:
+            ranges = index.split(workers * 2)
+        else:
+            with open(location, 'rb') as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    ranges = pcapDecoder.split_records(buf, workers * 2)
+                finally:
+                    buf.close()
+        accumulator = pcapStatistics.StatsAccumulator()
+        # The worker processes dissect and aggregate their ranges, their time is recorded as one stage
+        with stageMetrics.REGISTRY.time('pcap_parallel'):
+            context = trainingScheduler.get_context(['controller.pcapStatistics'])
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                starts = list(start for start, end in ranges)
+                ends = list(end for start, end in ranges)
+                for partial in pool.map(pcapStatistics.accumulate_range, [location] * len(ranges), starts, ends):
+                    accumulator.merge(partial)
+        with stageMetrics.REGISTRY.time('pcap_aggregate'):
+            return accumulator.to_stats_instance(filename)
+
+    def load_dataset(self):
+        """Method for loading the dataset and preparing the unsupervised (kmodes and kmeans) and supervised (naive
+        bayes and random forest) learning datasets
+
+        The dataset is parsed once with its schema, or read from the snapshot of an earlier start. The rows added
+        with ingest are kept in a file of their own and follow the rows of the dataset.
 
         :return: None
 
         """
-        self.sl_dataset = pd.read_csv(os.getcwd() + self.config['DEFAULT']['DATASET_PATH'], sep=',')
-        self.sl_dataset["ModemType"] = self.sl_dataset["ModemType"].astype('category')
-        self.sl_dataset["HasRouter"] = self.sl_dataset["HasRouter"].astype('category')
-        self.sl_dataset["RouterType"] = self.sl_dataset["RouterType"].astype('category')
-        self.sl_dataset["Subscription"] = self.sl_dataset["Subscription"].astype('category')
-        self.sl_dataset["ConnectionType"] = self.sl_dataset["ConnectionType"].astype('category')
-        self.sl_dataset["NetworkCard"] = self.sl_dataset["NetworkCard"].astype('category')
-        self.sl_dataset["ExternalNIC"] = self.sl_dataset["ExternalNIC"].astype('category')
-        self.sl_dataset["Processor"] = self.sl_dataset["Processor"].astype('category')
-        self.sl_dataset["Activities"] = self.sl_dataset["Activities"].astype('category')
-        self.sl_dataset["RouterSoftware"] = self.sl_dataset["RouterSoftware"].astype('category')
-        self.sl_dataset["Advice"] = self.sl_dataset["Advice"].astype('category')
+        snapshot = self.config['DEFAULT'].get('DATASET_SNAPSHOT_PATH')
+        dataset = datasetLoader.load(os.getcwd() + self.config['DEFAULT']['DATASET_PATH'],
+                                     os.getcwd() + snapshot if snapshot else None)
+        ingest_path = self.get_ingest_path()
+        if ingest_path is not None and os.path.exists(ingest_path):
+            dataset = datasetLoader.append(dataset, ingest_path)
+        self.ul_dataset, self.sl_dataset = datasetLoader.get_views(dataset)
+
+    def predict(self, modem_type, has_router, router_type, router_firmware, subscription, test_upload,
+                test_download, test_ping, processor_type, network_card, has_pcicard, connection, activity):
+        """Method for predicting the clusters and advice of the given input values
+
+        Unlike the unseen instance methods this method keeps nothing on the controller, so it can be called from
+        several threads at once. Models that are still warming up give None.
+
+        :param modem_type: Modem type input as string
+        :param has_router: Has router input as string
+        :param router_type: Router type input as string
+        :param router_firmware: Router firmware input as string
+        :param subscription: Subscription plan input as string
+        :param test_upload: Speedtest upload speed in MB/s input as int
+        :param test_download: Speedtest download speed in MB/s input as int
+        :param test_ping: Speedtest ping speed in ms input as int
+        :param processor_type: Processor type input as string
+        :param network_card: Network card type input as string
+        :param has_pcicard: Has PCI network card input as string
+        :param connection: Connection type input as string
+        :param activity: Activities input as string
+        :return: Dictionary with the kmodes and kmeans cluster and the Naive Bayes and Random Forest advice
+        :raises ValueError: When a value is unknown to the models or not a number
+
+        """
+        instance = unseenInstance.UnseenInstance(modem_type, has_router, router_type, router_firmware,
+                                                 subscription, test_upload, test_download, test_ping,
+                                                 processor_type, network_card, has_pcicard, connection, activity)
+        row = instance.get_feature_row()
+        # Models that are updated are replaced as a whole, so the models taken here stay consistent. A model is
+        # set before it is marked ready, so only models that are ready are taken and none is the unfitted one.
+        with self.model_lock:
+            feature_encoder, feature_columns, advice_classes = (self.feature_encoder, self.feature_columns,
+                                                                self.advice_encoder.classes_)
+            models = dict((name, getattr(self, name)) for name in ('kmodes', 'kmeans', 'nb_model', 'rf_model')
+                          if self.is_ready(name))
+        with stageMetrics.REGISTRY.time('encode'):
+            encoded = feature_encoder.encode_row(row).reshape(1, -1)
+        predictions = dict((name, None) for name in ('kmodes', 'kmeans', 'nb_model', 'rf_model'))
+        if 'kmodes' in models:
+            with stageMetrics.REGISTRY.time('predict_kmodes'):
+                raw = np.array(list(row[column] for column in feature_columns), dtype=object).reshape(1, -1)
+                predictions['kmodes'] = int(models['kmodes'].predict(raw)[0])
+        if 'kmeans' in models:
+            with stageMetrics.REGISTRY.time('predict_kmeans'):
+                predictions['kmeans'] = int(models['kmeans'].predict(encoded)[0])
+        if 'nb_model' in models:
+            with stageMetrics.REGISTRY.time('predict_nb_model'):
+                predictions['nb_model'] = advice_classes[models['nb_model'].predict(encoded)[0]]
+        if 'rf_model' in models:
+            with stageMetrics.REGISTRY.time('predict_rf_model'):
+                predictions['rf_model'] = advice_classes[models['rf_model'].predict(encoded)[0]]
+        stageMetrics.REGISTRY.count('predictions')
+        return predictions
 
     def get_kmodes_prediction(self):
         """Method for predicting cluster of the unseen instance
@@ -249,6 +664,35 @@ class Controller:
         prediction = self.kmeans.predict(self.unseen_instance.get_array().reshape(1, -1))[0]
         return prediction
 
+    def train_models(self):
+        """Method for training all models at the same time with the training scheduler
+
+        The four models are fitted in TRAINING_WORKERS worker processes, the random forest and the KModes restarts
+        use MODEL_JOBS cores each, shared between the workers when there are several. The time every fit took is
+        printed and kept in training_times.
+
+        :return: None
+
+        """
+        scheduler = trainingScheduler.TrainingScheduler(self.config['DEFAULT'].get('TRAINING_WORKERS', 1))
+        jobs = scheduler.get_model_jobs(self.config['DEFAULT'].get('MODEL_JOBS', 1), 4)
+        self.kmodes.set_params(n_jobs=jobs)
+        self.rf_model.set_params(n_jobs=jobs)
+        # The slowest models first, so they are not started last
+        scheduler.add('rf_model', self.rf_model, self.train_values, self.train_labels)
+        scheduler.add('kmodes', self.kmodes, self.ul_dataset)
+        scheduler.add('kmeans', self.kmeans, self.train_values)
+        scheduler.add('nb_model', self.nb_model, self.train_values, self.train_labels)
+        start = time.time()
+        for name, model, seconds in scheduler.run():
+            setattr(self, name, model)
+            if name in self.metrics_names:
+                self.calculate_metrics(name)
+            self.model_ready[name].set()
+            self.training_times[name] = seconds
+            print("Trained {} in {:.2f} seconds".format(name, seconds))
+        print("Trained all models in {:.2f} seconds".format(time.time() - start))
+
     def train_kmodes(self):
         """Method for training kmodes (clustering) model
 
@@ -281,14 +725,237 @@ class Controller:
         """
         self.kmeans.fit(self.train_values)
 
+    def load_models(self):
+        """Method for loading the fitted models and encoders from the model store
+
+        The artifact is looked up by the hash of the dataset and the hyperparameters of the models, so the models
+        are only used when they were trained on the same dataset with the same configuration.
+
+        :return: True when the models were loaded, False when they have to be trained
+
+        """
+        if self.model_store is None:
+            return False
+        self.model_key = self.get_model_key()
+        artifact = self.model_store.load(self.model_key)
+        if artifact is None or any(name not in artifact for name in self.artifact_names):
+            return False
+        for name in self.artifact_names:
+            setattr(self, name, artifact[name])
+        self.feature_encoder.unknown_category = self.config['DEFAULT'].get('ENCODER_UNKNOWN_CATEGORY')
+        return True
+
+    def get_model_key(self):
+        """Getter method for the key of the models in the model store
+
+        :return: Key of the current dataset and hyperparameters as string
+
+        """
+        models = dict((name, getattr(self, name)) for name in ('kmodes', 'nb_model', 'rf_model', 'kmeans'))
+        locations = [os.getcwd() + self.config['DEFAULT']['DATASET_PATH']]
+        if self.get_ingest_path() is not None:
+            locations.append(self.get_ingest_path())
+        return modelStore.ModelStore.make_key(locations, models)
+
+    def get_ingest_path(self):
+        """Getter method for the location of the file the ingested rows are appended to
+
+        :return: Location of the file as string, None when INGEST_PATH is not configured
+
+        """
+        ingest_path = self.config['DEFAULT'].get('INGEST_PATH')
+        return os.getcwd() + ingest_path if ingest_path else None
+
+    def save_models(self):
+        """Method for saving the fitted models and encoders to the model store
+
+        :return: None
+
+        """
+        if self.model_store is not None:
+            artifact = dict((name, getattr(self, name)) for name in self.artifact_names)
+            self.model_store.save(self.model_key, artifact)
+
+    def ingest(self, rows):
+        """Method for adding labeled rows to the dataset and updating the models with them
+
+        The rows are appended to the INGEST_PATH file, which load_dataset adds to the dataset. New categories are
+        added to the feature encoder, the Naive Bayes model is updated with partial_fit and the kmeans cluster
+        centres are moved towards the new rows, all on copies that replace the models when they are done. The
+        random forest and kmodes only learn the rows when they are refitted, which the refit loop does every
+        INGEST_REFIT_SECONDS.
+
+        :param rows: DataFrame in the finaladvice.csv layout, including the Advice column
+        :return: Amount of rows used for the incremental updates, rows with an unknown advice or a speed value
+                 that is not a number only reach the models with the next refit
+        :raises ValueError: When the models are still warming up, a column of the dataset is missing or INGEST_PATH
+                            is not configured
+
+        """
+        if not all(self.is_ready(name) for name in self.readiness_names):
+            raise ValueError("The models are warming up")
+        columns = list(self.sl_dataset.columns)
+        missing = list(column for column in columns if column not in rows.columns)
+        if missing:
+            raise ValueError("Missing columns: " + ", ".join(missing))
+        rows = rows[columns]
+        ingest_path = self.get_ingest_path()
+        if ingest_path is None:
+            raise ValueError("INGEST_PATH is not configured")
+        with self.ingest_lock:
+            os.makedirs(os.path.dirname(ingest_path), exist_ok=True)
+            rows.to_csv(ingest_path, mode='a', header=not os.path.exists(ingest_path), index=False)
+            self.pending_batches.append(rows)
+            return self.update_models(rows)
+
+    def update_models(self, rows):
+        """Method for updating the feature encoder, Naive Bayes and kmeans with labeled rows
+
+        The caller holds the ingest lock.
+
+        :param rows: DataFrame with the columns of the dataset, including the Advice column
+        :return: Amount of rows used for the update
+
+        """
+        feature_encoder = copy.deepcopy(self.feature_encoder)
+        for column in feature_encoder.tables:
+            feature_encoder.extend(column, rows[column].dropna())
+        encoded, valid = feature_encoder.encode_frame(rows)
+        advice_codes = rows['Advice'].astype(str).map(
+            dict((str(label), code) for code, label in enumerate(self.advice_encoder.classes_))
+        )
+        valid &= advice_codes.isin(self.nb_model.classes_).values
+        nb_model = self.nb_model
+        kmeans = self.kmeans
+        kmeans_counts = self.kmeans_counts
+        if valid.any():
+            values = encoded[valid]
+            nb_model = copy.deepcopy(self.nb_model)
+            nb_model.partial_fit(values, advice_codes[valid].astype(np.int64).values)
+            kmeans, kmeans_counts = self.update_kmeans(values)
+        with self.model_lock:
+            self.feature_encoder = feature_encoder
+            self.nb_model = nb_model
+            self.kmeans = kmeans
+            self.kmeans_counts = kmeans_counts
+        self.calculate_metrics('nb_model')
+        return int(valid.sum())
+
+    def ingest_csv(self, file):
+        """Method for adding the labeled rows of a CSV file to the dataset and updating the models with them
+
+        :param file: Location or file object of a CSV file in the finaladvice.csv layout, including the Advice column
+        :return: Amount of rows used for the incremental updates
+        :raises ValueError: When the file cannot be parsed or a column of the dataset is missing
+
+        """
+        return self.ingest(pd.read_csv(file, sep=','))
+
+    def update_kmeans(self, values):
+        """Method for moving the kmeans cluster centres towards new rows, as a mini-batch update
+
+        Every centre becomes the mean of the rows it was trained on and the new rows assigned to it.
+
+        :param values: Encoded rows
+        :return: Tuple of the updated copy of the kmeans model and the amount of rows of every cluster
+
+        """
+        kmeans = copy.deepcopy(self.kmeans)
+        counts = self.kmeans_counts
+        if counts is None:
+            counts = np.bincount(kmeans.labels_, minlength=len(kmeans.cluster_centers_)).astype(np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        clusters = kmeans.predict(values)
+        added = np.bincount(clusters, minlength=len(counts)).astype(np.float64)
+        sums = np.zeros_like(kmeans.cluster_centers_)
+        np.add.at(sums, clusters, values)
+        updated = added > 0
+        kmeans.cluster_centers_[updated] = ((kmeans.cluster_centers_[updated] * counts[updated, None] +
+                                             sums[updated]) / (counts[updated] + added[updated])[:, None])
+        return kmeans, counts + added
+
+    def refit_loop(self):
+        """Method for refitting all models every INGEST_REFIT_SECONDS when rows were ingested
+
+        :return: None
+
+        """
+        while True:
+            time.sleep(self.config['DEFAULT']['INGEST_REFIT_SECONDS'])
+            if self.pending_batches:
+                # noinspection PyBroadException
+                try:
+                    self.refit()
+                except Exception as ex:
+                    print("Refitting the models failed: " + ex.__str__())
+
+    def refit(self):
+        """Method for training all models from scratch on the dataset file, including the ingested rows
+
+        The models are trained on a separate controller and replace the models of this controller when they are
+        all trained, so predictions go on with the current models in the meantime. Rows ingested during the
+        training are not in the new models, they are applied to them again after the swap.
+
+        :return: None
+
+        """
+        shadow = Controller.__new__(Controller)
+        shadow.config = self.config
+        shadow.model_store = self.model_store
+        shadow.model_ready = dict((name, threading.Event()) for name in self.readiness_names)
+        shadow.metrics = {}
+        shadow.training_times = {}
+        for name in ('kmodes', 'nb_model', 'rf_model', 'kmeans'):
+            setattr(shadow, name, base.clone(getattr(self, name)))
+        for column, name in list(self.column_encoders.items()) + [('Advice', 'advice_encoder')]:
+            setattr(shadow, name, preprocessing.LabelEncoder())
+        with self.ingest_lock:
+            shadow.load_dataset()
+            pending = len(self.pending_batches)
+        shadow.create_datasets()
+        shadow.train_models()
+        shadow.model_key = shadow.get_model_key()
+        shadow.save_models()
+        with self.ingest_lock:
+            with self.model_lock:
+                for name in self.artifact_names + ('ul_dataset', 'sl_dataset', 'feature_columns', 'train_values',
+                                                   'test_values', 'train_labels', 'test_labels', 'model_key',
+                                                   'training_times'):
+                    setattr(self, name, getattr(shadow, name))
+                self.kmeans_counts = None
+            # Rows ingested while the models were trained are not in the new models yet
+            self.pending_batches = self.pending_batches[pending:]
+            for rows in self.pending_batches:
+                self.update_models(rows)
+
+    def calculate_metrics(self, name):
+        """Method for calculating the metrics of a classification model on the test dataset
+
+        The test dataset is predicted once, after training, and the metrics are kept in the metrics registry.
+
+        :param name: Name of the model attribute, 'nb_model' or 'rf_model'
+        :return: None
+
+        """
+        ph = getattr(self, name).predict(self.test_values)
+        self.metrics[name] = metricsModel.MetricsInstance.from_predictions(self.test_labels, ph)
+
+    def get_metrics(self, name):
+        """Getter method for the metrics of a classification model from the metrics registry
+
+        :param name: Name of the model attribute, 'nb_model' or 'rf_model'
+        :return: Metrics class instance
+
+        """
+        return self.metrics[name]
+
     def get_bayes_accuracy(self):
         """Method for getting the accuracy of the Naive Bayes model using accuracy score and test dataset
 
         :return: Accuracy of the model as float
 
         """
-        ph = self.nb_model.predict(self.test_values)
-        return accuracy_score(self.test_labels, ph)
+        return self.get_metrics('nb_model').accuracy
 
     def get_rf_accuracy(self):
         """Method for getting the accuracy of the Random Forest model using accuracy score and test dataset
@@ -296,26 +963,27 @@ class Controller:
         :return: Accuracy of model as float
 
         """
-        ph = self.rf_model.predict(self.test_values)
-        return accuracy_score(self.test_labels, ph)
+        return self.get_metrics('rf_model').accuracy
 
     def get_bayes_confmatrix(self):
-        """Method for calculating the confusion matrix of the Naive Bayes model
+        """Method for getting the confusion matrix of the Naive Bayes model
 
-        :return: Prints confusion matrix of Naive Bayes model
+        :return: Prints and returns confusion matrix of Naive Bayes model
 
         """
-        ph = self.nb_model.predict(self.test_values)
-        print(pd.crosstab(self.test_labels, ph, rownames=['True'], colnames=['Predicted'], margins=True))
+        table = self.get_metrics('nb_model').get_crosstab()
+        print(table)
+        return table
 
     def get_rf_confmatrix(self):
-        """Method for calculating the confusion matrix of the Random Forests model
+        """Method for getting the confusion matrix of the Random Forests model
 
-        :return: Prints confusion matrix of Random Forests model
+        :return: Prints and returns confusion matrix of Random Forests model
 
         """
-        ph = self.rf_model.predict(self.test_values)
-        print(pd.crosstab(self.test_labels, ph, rownames=['True'], colnames=['Predicted'], margins=True))
+        table = self.get_metrics('rf_model').get_crosstab()
+        print(table)
+        return table
 
     def create_datasets(self):
         """Method for creating test datasets and training datasets
@@ -347,47 +1015,91 @@ class Controller:
         self.router_firmware_encoder.fit(ph['RouterSoftware'])
         ph['RouterSoftware'] = self.router_firmware_encoder.transform(ph['RouterSoftware'])
         x = ph
+        self.feature_columns = list(x.columns)
+        self.feature_encoder = featureEncoder.FeatureEncoder.from_label_encoders(
+            self.feature_columns,
+            dict((column, getattr(self, name)) for column, name in self.column_encoders.items()),
+            self.config['DEFAULT'].get('ENCODER_UNKNOWN_CATEGORY')
+        )
         ph = self.sl_dataset[['Advice']]
         self.advice_encoder.fit(ph['Advice'])
         ph = self.advice_encoder.transform(ph['Advice'])
         y = ph
-        self.train_values, self.test_values, self.train_labels, self.test_labels = train_test_split(x, y, test_size=0.3,
-                                                            stratify=y, random_state=123456)
+        # Stratifying needs two rows of every advice, an ingested row can bring an advice that occurs only once
+        stratify = y if np.bincount(y).min() >= 2 else None
+        self.train_values, self.test_values, self.train_labels, self.test_labels = model_selection.train_test_split(
+            x, y, test_size=0.3, stratify=stratify, random_state=123456)
+
+    def encode_dataset(self, dataset):
+        """Method for encoding the feature columns of a dataset in the finaladvice.csv layout
+
+        Every column is encoded at once. Rows with a value that cannot be encoded are marked as invalid and get a
+        placeholder code.
+
+        :param dataset: DataFrame with (at least) the feature columns
+        :return: Tuple of the encoded DataFrame and a boolean array marking the valid rows
+
+        """
+        return self.feature_encoder.encode_frame(dataset)
+
+    def predict_dataset(self, dataset):
+        """Method for predicting the clusters and advice of every row of a dataset
+
+        The dataset is encoded column by column and every model predicts all rows at once.
+
+        :param dataset: DataFrame in the finaladvice.csv layout, the Advice column is not needed
+        :return: DataFrame with the kmodes and kmeans cluster and the Naive Bayes and Random Forest advice of every
+                 row, the advice is empty for rows with unknown inputs
+
+        """
+        encoded, valid = self.encode_dataset(dataset)
+        result = pd.DataFrame(index=dataset.index)
+        result['KModesCluster'] = self.kmodes.predict(dataset[self.feature_columns].astype(object).values)
+        kmeans_clusters = np.full(len(dataset), -1)
+        nb_advice = np.full(len(dataset), '', dtype=object)
+        rf_advice = np.full(len(dataset), '', dtype=object)
+        if valid.any():
+            values = encoded[valid]
+            kmeans_clusters[valid] = self.kmeans.predict(values)
+            nb_advice[valid] = self.advice_encoder.inverse_transform(self.nb_model.predict(values))
+            rf_advice[valid] = self.advice_encoder.inverse_transform(self.rf_model.predict(values))
+        result['KMeansCluster'] = kmeans_clusters
+        result['NaiveBayesAdvice'] = nb_advice
+        result['RandomForestAdvice'] = rf_advice
+        return result
+
+    def predict_csv(self, input_location, output_location, chunk_rows):
+        """Method for predicting every row of a CSV file and writing the predictions to another CSV file
+
+        The input is read and predicted in chunks, every chunk is written out before the next is read, so any
+        amount of rows can be predicted. The throughput is printed after every chunk.
+
+        :param input_location: Location of the CSV file in the finaladvice.csv layout
+        :param output_location: Location of the CSV file to write, the input columns followed by the predictions
+        :param chunk_rows: Amount of rows predicted at once
+        :return: Tuple of the amount of rows and the seconds it took
+
+        """
+        start = time.time()
+        rows = 0
+        for number, chunk in enumerate(pd.read_csv(input_location, sep=',', chunksize=chunk_rows)):
+            output = pd.concat([chunk, self.predict_dataset(chunk)], axis=1)
+            output.to_csv(output_location, mode='w' if number == 0 else 'a', header=number == 0, index=False)
+            rows += len(chunk)
+            seconds = time.time() - start
+            print("Predicted {} rows in {:.2f} seconds ({:.0f} rows/s)".format(rows, seconds,
+                                                                             rows / max(seconds, 1e-9)))
+        return rows, time.time() - start
 
     def create_encoded_instance(self):
         """Method for encoding unseen instance for use in prediction model
 
         :return: None
+        :raises ValueError: When a value is unknown to the models
 
         """
-        self.encoded_instance = self.unseen_instance
-        self.encoded_instance.activity = self.activities_encoder.transform(
-            np.array([self.encoded_instance.activity])
-        )[0]
-        self.encoded_instance.has_router = self.has_router_encoder.transform(
-            np.array([self.encoded_instance.has_router])
-        )[0]
-        self.encoded_instance.modem_type = self.modem_type_encoder.transform(
-            np.array([self.encoded_instance.modem_type])
-        )[0]
-        self.encoded_instance.router_type = self.router_type_encoder.transform(
-            np.array([self.encoded_instance.router_type])
-        )[0]
-        self.encoded_instance.subscription = self.subscription_encoder.transform(
-            np.array([self.encoded_instance.subscription])
-        )[0]
-        self.encoded_instance.connection = self.connection_encoder.transform(
-            np.array([self.encoded_instance.connection])
-        )[0]
-        self.encoded_instance.network_card = self.network_card_encoder.transform(
-            np.array([self.encoded_instance.network_card])
-        )[0]
-        self.encoded_instance.has_pcicard = self.has_external_encoder.transform(
-            np.array([self.encoded_instance.has_pcicard])
-        )[0]
-        self.encoded_instance.processor_type = self.processor_encoder.transform(
-            np.array([self.encoded_instance.processor_type])
-        )[0]
-        self.encoded_instance.router_firmware = self.router_firmware_encoder.transform(
-            np.array([self.encoded_instance.router_firmware])
-        )[0]
+        with stageMetrics.REGISTRY.time('encode'):
+            self.encoded_instance = self.unseen_instance
+            for field, column in self.instance_columns.items():
+                setattr(self.encoded_instance, field,
+                        self.feature_encoder.get_code(column, getattr(self.encoded_instance, field)))
@@ -0,0 +1,144 @@
+try:
+    # Import of Helper libraries
+    import os
+    import numpy as np
+    import pandas as pd
+    from pandas.api.types import union_categoricals
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+# Schema of the dataset: the categorical columns and the numeric columns with their type
+CATEGORY_COLUMNS = ('ModemType', 'HasRouter', 'RouterType', 'RouterSoftware', 'Subscription', 'ConnectionType',
+                    'NetworkCard', 'ExternalNIC', 'Processor', 'Activities', 'Advice')
+NUMERIC_COLUMNS = {'Ping': 'float64', 'TestDownload': 'float64', 'TestUpload': 'float64'}
+LABEL_COLUMN = 'Advice'
+# Version of the snapshot layout, change it when the layout or the schema changes so old snapshots are skipped
+SNAPSHOT_VERSION = 1
+
+
+def read_csv(location):
+    """Function for parsing the dataset CSV with the schema of the dataset
+
+    Every column is given its type while parsing, so the DataFrame is built once.
+
+    :param location: Location of the CSV file
+    :return: DataFrame with categorical and float columns
+
+    """
+    dtypes = dict((column, 'category') for column in CATEGORY_COLUMNS)
+    dtypes.update(NUMERIC_COLUMNS)
+    return pd.read_csv(location, sep=',', dtype=dtypes)
+
+
+def get_source(location):
+    """Function for getting the size and modification time of the dataset, which a snapshot has to match
+
+    :param location: Location of the CSV file
+    :return: Array (int64) of the snapshot version, the size in bytes and the modification time in nanoseconds
+
+    """
+    stat = os.stat(location)
+    return np.array([SNAPSHOT_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def write_snapshot(dataset, location, source):
+    """Function for writing a DataFrame as NumPy snapshot
+
+    Categorical columns are stored as their categories and integer codes, numeric columns as they are.
+
+    :param dataset: DataFrame read with read_csv
+    :param location: Location of the snapshot (.npz)
+    :param source: Array from get_source of the CSV file the DataFrame was read from
+    :return: None
+
+    """
+    arrays = {'__source__': source, '__columns__': np.array(dataset.columns, dtype=str)}
+    for column in dataset.columns:
+        if column in CATEGORY_COLUMNS:
+            arrays[column + '.categories'] = np.array(dataset[column].cat.categories, dtype=str)
+            arrays[column + '.codes'] = dataset[column].cat.codes.values
+        else:
+            arrays[column] = dataset[column].values
+    directory = os.path.dirname(location)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = location + '.tmp.npz'
+    np.savez(temporary, **arrays)
+    os.replace(temporary, location)
+
+
+def read_snapshot(location, source):
+    """Function for reading a NumPy snapshot back into a DataFrame
+
+    :param location: Location of the snapshot (.npz)
+    :param source: Array from get_source of the current CSV file
+    :return: DataFrame, None when there is no snapshot or it was made from another version of the CSV file
+
+    """
+    try:
+        with np.load(location, allow_pickle=False) as arrays:
+            if not np.array_equal(arrays['__source__'], source):
+                return None
+            columns = {}
+            for column in arrays['__columns__']:
+                column = str(column)
+                if column in CATEGORY_COLUMNS:
+                    columns[column] = pd.Categorical.from_codes(arrays[column + '.codes'],
+                                                                arrays[column + '.categories'])
+                else:
+                    columns[column] = arrays[column]
+    except (OSError, KeyError, ValueError):
+        return None
+    return pd.DataFrame(columns)
+
+
+def load(location, snapshot_location=None):
+    """Function for loading the dataset, from the snapshot when it matches the CSV file
+
+    :param location: Location of the CSV file
+    :param snapshot_location: Location of the snapshot (.npz), None to always parse the CSV file
+    :return: DataFrame with categorical and float columns
+
+    """
+    if snapshot_location is None:
+        return read_csv(location)
+    source = get_source(location)
+    dataset = read_snapshot(snapshot_location, source)
+    if dataset is None:
+        dataset = read_csv(location)
+        try:
+            write_snapshot(dataset, snapshot_location, source)
+        except OSError:
+            pass
+    return dataset
+
+
+def append(dataset, location):
+    """Function for appending the rows of a second CSV file in the dataset layout to the dataset
+
+    The categorical columns stay categorical, with the categories of both files.
+
+    :param dataset: DataFrame from load
+    :param location: Location of the CSV file with the rows to append
+    :return: DataFrame with the rows of the dataset followed by the rows of the file
+
+    """
+    rows = read_csv(location)
+    columns = {}
+    for column in dataset.columns:
+        if column in CATEGORY_COLUMNS:
+            columns[column] = union_categoricals([dataset[column].values, rows[column].values])
+        else:
+            columns[column] = np.concatenate([dataset[column].values, rows[column].values])
+    return pd.DataFrame(columns)
+
+
+def get_views(dataset):
+    """Function for deriving the unsupervised and supervised views of the dataset
+
+    :param dataset: DataFrame from load
+    :return: Tuple of the dataset without the label column (clustering) and the whole dataset (classification)
+
+    """
+    return dataset.drop(columns=[LABEL_COLUMN]), dataset
@@ -0,0 +1,238 @@
+try:
+    from controller import pcapDecoder
+    from model import statsModel
+    # Import of Helper libraries
+    import heapq
+    import struct
+    import numpy as np
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+# Seconds without packets after which a flow is finished
+FLOW_IDLE_TIMEOUT = 60.0
+# Amount of finished flows kept, only the largest flows by bytes are kept
+FLOW_KEEP = 1000
+# Layout of the flows handed to the statistics model
+FLOW_DTYPE = np.dtype([('src', 'S16'), ('dst', 'S16'), ('sport', '<u2'), ('dport', '<u2'), ('protocol', 'U16'),
+                       ('bytes', '<i8'), ('packets', '<i8'), ('first', '<f8'), ('last', '<f8')])
+IPV4_MAPPED_LOW = 0xffff << 32
+
+
+def address_halves(ip4, address4, address6):
+    """Function for turning the IPv4 and IPv6 address columns of a batch into 64 bit halves
+
+    IPv4 addresses become IPv4-mapped IPv6 addresses, the same form the statistics model uses.
+
+    :param ip4: Boolean array marking the IPv4 packets
+    :param address4: Array (uint32) of IPv4 addresses
+    :param address6: Array (S16) of IPv6 addresses
+    :return: Tuple of the high and low halves as uint64 arrays
+
+    """
+    halves = np.frombuffer(address6.tobytes(), dtype='>u8').reshape(-1, 2).astype(np.uint64)
+    high = np.where(ip4, np.uint64(0), halves[:, 0])
+    low = np.where(ip4, np.uint64(IPV4_MAPPED_LOW) | address4.astype(np.uint64), halves[:, 1])
+    return high, low
+
+
+class FlowTable:
+    """Flow table class
+
+    The flow table groups the packets of a capture by 5-tuple (source and destination address and port and the IP
+    protocol) into flows holding bytes, packets and the first and last time a packet was seen. Flows live in a
+    dictionary indexed by their 5-tuple while active. A flow without packets for idle_timeout seconds is finished
+    and moved to a heap holding only the largest finished flows, so memory stays bounded on long captures. A
+    packet of a finished 5-tuple starts a new flow.
+
+    Batches are grouped with NumPy first, so the dictionary is updated once per flow in a batch instead of once
+    per packet. A run of packets of one 5-tuple is split wherever two packets are more than idle_timeout apart, so
+    a batch gives the same flows as its packets added one by one. Idle flows are finished by a pass over the active
+    flows, made at most once per idle_timeout seconds of capture time.
+
+    Finished flows that started within idle_timeout of the first packet of the table are all kept, not only the
+    largest ones. When the table holds a range of a capture, these are the flows that may continue a flow of the
+    previous range, so merge can always join them.
+
+    """
+    idle_timeout = FLOW_IDLE_TIMEOUT
+    keep = FLOW_KEEP
+    flow_count = 0
+    # Capture time of the last pass over the active flows
+    evict_time = None
+    # Capture time of the first packet of the table
+    first_time = None
+
+    def __init__(self, idle_timeout=FLOW_IDLE_TIMEOUT, keep=FLOW_KEEP):
+        """Constructor method for making an empty flow table
+
+        :param idle_timeout: Seconds without packets after which a flow is finished
+        :param keep: Amount of finished flows to keep
+
+        """
+        self.idle_timeout = idle_timeout
+        self.keep = keep
+        self.active = {}
+        self.finished = []
+        self.head = []
+
+    def add_batch(self, batch):
+        """Method for adding a batch of decoded packets to the flow table
+
+        The packets are sorted by flow key with a lexicographic sort over the key columns, after which every flow is
+        a run of packets that is summed up at once.
+
+        :param batch: Dictionary of NumPy columns as made by pcapDecoder.iter_batches
+        :return: None
+
+        """
+        ip = batch['ip4'] | batch['ip6']
+        if not ip.any():
+            return
+        ip4 = batch['ip4'][ip]
+        src_high, src_low = address_halves(ip4, batch['src4'][ip], batch['src6'][ip])
+        dst_high, dst_low = address_halves(ip4, batch['dst4'][ip], batch['dst6'][ip])
+        columns = (src_high, src_low, dst_high, dst_low, batch['sport'][ip], batch['dport'][ip], batch['proto'][ip])
+        order = np.lexsort(columns[::-1])
+        columns = list(column[order] for column in columns)
+        change = np.zeros(len(order), dtype=bool)
+        change[0] = True
+        for column in columns:
+            change[1:] |= column[1:] != column[:-1]
+        times = batch['time'][ip][order]
+        # The sort keeps the capture order within a flow, a gap longer than the idle timeout starts a new flow
+        change[1:] |= np.diff(times) > self.idle_timeout
+        starts = np.flatnonzero(change)
+        sizes = np.add.reduceat(batch['wirelen'][ip][order].astype(np.int64), starts)
+        counts = np.diff(starts, append=len(order))
+        first = np.minimum.reduceat(times, starts)
+        last = np.maximum.reduceat(times, starts)
+        keys = zip(*(column[starts].tolist() for column in columns))
+        for key, size, count, start, end in zip(keys, sizes.tolist(), counts.tolist(), first.tolist(), last.tolist()):
+            self.add_flow(key, size, count, start, end)
+        self.check_idle(float(times.max()))
+
+    def add_packet(self, src, dst, sport, dport, proto, length, time):
+        """Method for adding a single packet to the flow table
+
+        :param src: Source IP address as string
+        :param dst: Destination IP address as string
+        :param sport: Source port, 0 for packets without ports
+        :param dport: Destination port, 0 for packets without ports
+        :param proto: IP protocol number
+        :param length: Length of the packet on the wire
+        :param time: Capture timestamp of the packet in seconds
+        :return: None
+
+        """
+        key = struct.unpack('>QQ', statsModel.pack_address(src)) + struct.unpack('>QQ', statsModel.pack_address(dst))
+        self.add_flow(key + (sport, dport, proto), length, 1, time, time)
+        self.check_idle(time)
+
+    def add_flow(self, key, size, count, start, end):
+        """Method for adding the packets of one flow to the table
+
+        :param key: Flow key tuple of both addresses as two 64 bit halves, the ports and the IP protocol number
+        :param size: Amount of bytes
+        :param count: Amount of packets
+        :param start: Time of the first packet
+        :param end: Time of the last packet
+        :return: None
+
+        """
+        if self.first_time is None or start < self.first_time:
+            self.first_time = start
+        flow = self.active.get(key)
+        if flow is not None and start - flow[3] > self.idle_timeout:
+            self.finish(key, self.active.pop(key))
+            flow = None
+        if flow is None:
+            self.active[key] = [size, count, start, end]
+            self.flow_count += 1
+        else:
+            flow[0] += size
+            flow[1] += count
+            flow[2] = min(flow[2], start)
+            flow[3] = max(flow[3], end)
+
+    def finish(self, key, flow):
+        """Method for moving a flow to the finished flows, keeping only the largest ones and the flows at the start
+
+        :param key: Flow key tuple
+        :param flow: List of bytes, packets, first and last time
+        :return: None
+
+        """
+        if flow[2] - self.first_time <= self.idle_timeout:
+            self.head.append((key, flow))
+            return
+        entry = (flow[0], flow[2], key, flow)
+        if len(self.finished) < self.keep:
+            heapq.heappush(self.finished, entry)
+        elif entry[:2] > self.finished[0][:2]:
+            heapq.heapreplace(self.finished, entry)
+
+    def check_idle(self, now):
+        """Method for finishing the idle flows when the capture time advanced more than the idle timeout
+
+        A pass over the active flows takes time linear in their amount, so it is not made for every packet or batch.
+        Flows are finished at most two idle timeouts after their last packet, add_flow finishes a flow that gets a
+        packet after a longer gap itself.
+
+        :param now: Current capture time in seconds
+        :return: None
+
+        """
+        if self.evict_time is None:
+            self.evict_time = now
+        elif now - self.evict_time > self.idle_timeout:
+            self.evict(now)
+
+    def evict(self, now):
+        """Method for finishing all flows that were idle for longer than the idle timeout
+
+        :param now: Current capture time in seconds
+        :return: None
+
+        """
+        idle = list(key for key, flow in self.active.items() if now - flow[3] > self.idle_timeout)
+        for key in idle:
+            self.finish(key, self.active.pop(key))
+        self.evict_time = now
+
+    def merge(self, other):
+        """Method for merging the flow table of a later part of the same capture into this one
+
+        Flows of the other table that continue an active flow of this table within the idle timeout are joined
+        with it. Those flows started within the idle timeout of the first packet of the other table, so the other
+        table kept them even when they were finished and small.
+
+        :param other: FlowTable of the packets following the packets of this table
+        :return: None
+
+        """
+        flows = other.head + list((key, flow) for _, _, key, flow in other.finished) + list(other.active.items())
+        # add_flow counts the flows added here again, unless they are joined
+        self.flow_count += other.flow_count - len(flows)
+        for key, flow in sorted(flows, key=lambda item: item[1][2]):
+            self.add_flow(key, flow[0], flow[1], flow[2], flow[3])
+        if flows:
+            self.evict(max(flow[3] for _, flow in flows))
+
+    def top(self, amount, start_time=0.0):
+        """Method for getting the largest flows by bytes
+
+        :param amount: Amount of flows to return
+        :param start_time: Time subtracted from the first and last times, usually the start of the capture
+        :return: Structured array of FLOW_DTYPE entries, largest flow first
+
+        """
+        flows = list((flow[0], flow[2], key, flow) for key, flow in list(self.active.items()) + self.head)
+        flows += self.finished
+        largest = heapq.nlargest(amount, flows, key=lambda entry: entry[:2])
+        result = np.empty(len(largest), dtype=FLOW_DTYPE)
+        for row, (_, _, key, flow) in enumerate(largest):
+            result[row] = (struct.pack('>QQ', key[0], key[1]), struct.pack('>QQ', key[2], key[3]), key[4], key[5],
+                           pcapDecoder.PROTOCOL_NAMES[key[6]], flow[0], flow[1], flow[2] - start_time,
+                           flow[3] - start_time)
+        return result
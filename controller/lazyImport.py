@@ -0,0 +1,56 @@
+try:
+    # Import of Helper libraries
+    import importlib
+    import importlib.util
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+
+class LazyModule:
+    """Lazy module class
+
+    Stand-in for a library that takes long to import (pandas, scikit-learn, kmodes, scapy). The library is imported
+    the first time one of its attributes is used, so the app server can start before it is loaded. Whether the
+    library is installed is checked at once, so a missing library is still reported when the program starts. The
+    attributes of the stand-in itself have names no proxied module uses.
+
+    """
+    loaded_module = None
+
+    def __init__(self, name):
+        """Constructor method for making a lazy module
+
+        :param name: Full name of the module, for example 'sklearn.ensemble'
+        :raises ImportError: When the package of the module is not installed
+
+        """
+        if importlib.util.find_spec(name.partition('.')[0]) is None:
+            raise ImportError("No module named '{}'".format(name.partition('.')[0]))
+        self.module_name = name
+
+    def import_module(self):
+        """Method for importing the module, when it is not imported yet
+
+        The import machinery makes threads that use the module at the same time wait for one import.
+
+        :return: The imported module
+
+        """
+        if self.loaded_module is None:
+            self.loaded_module = importlib.import_module(self.module_name)
+        return self.loaded_module
+
+    def is_imported(self):
+        """Method for checking if the module is imported
+
+        :return: True when the module is imported
+
+        """
+        return self.loaded_module is not None
+
+    def __getattr__(self, attribute):
+        # A stand-in that is not made by the constructor (copied or unpickled) has no module to import
+        if 'module_name' not in self.__dict__:
+            raise AttributeError(attribute)
+        return getattr(self.import_module(), attribute)
@@ -0,0 +1,124 @@
+try:
+    from controller import lazyImport
+    # Import of Helper libraries
+    import os
+    import json
+    import pickle
+    import hashlib
+    # Imported on first use, the store is made when the app server starts
+    joblib = lazyImport.LazyModule('joblib')
+    sklearn = lazyImport.LazyModule('sklearn')
+    kmodes = lazyImport.LazyModule('kmodes')
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+# Version of the stored artifacts, change it when the stored models or encoders change so old artifacts are skipped
+STORE_VERSION = 'models-3'
+STORE_SUFFIX = '.joblib'
+HASH_CHUNK_SIZE = 1024 * 1024
+# Hyperparameters that do not change the fitted model, left out of the key
+RUNTIME_PARAMETERS = ('n_jobs', 'verbose')
+
+
+def describe_parameter(value):
+    """Function for describing a hyperparameter that has no JSON form, such as a dissimilarity function
+
+    :param value: Hyperparameter value
+    :return: Description as string that stays the same between processes
+
+    """
+    if callable(value):
+        return getattr(value, '__module__', '') + '.' + getattr(value, '__qualname__', type(value).__name__)
+    return str(value)
+
+
+class ModelStore:
+    """Model store class
+
+    The model store keeps the fitted models, encoders and metrics of the controller as one artifact on disk. An
+    artifact is keyed by a hash of the dataset, the hyperparameters of the models and the library versions, so a
+    changed dataset or configuration never loads a stale artifact. The NumPy arrays of the artifact (the trees of the
+    random forest, the cluster centres) are memory-mapped when it is loaded instead of being read into memory.
+
+    """
+    directory = ""
+
+    def __init__(self, directory):
+        """Constructor method for making a model store
+
+        :param directory: Folder holding the artifacts
+
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(dataset_locations, models):
+        """Method for making the key of an artifact
+
+        :param dataset_locations: Locations of the files of the dataset the models are trained on, files that do
+                                  not exist are skipped
+        :param models: Dictionary of model name and unfitted or fitted model, only the hyperparameters are used
+        :return: Artifact key as hexadecimal string
+
+        """
+        digest = hashlib.sha256(STORE_VERSION.encode())
+        digest.update(sklearn.__version__.encode())
+        digest.update(kmodes.__version__.encode())
+        for location in dataset_locations:
+            if not os.path.exists(location):
+                continue
+            digest.update(os.path.basename(location).encode())
+            with open(location, 'rb') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+        params = dict((name, dict((key, value) for key, value in model.get_params().items()
+                                  if key not in RUNTIME_PARAMETERS))
+                      for name, model in models.items())
+        digest.update(json.dumps(params, sort_keys=True, default=describe_parameter).encode())
+        return digest.hexdigest()
+
+    def get_location(self, key):
+        """Getter method for the location of an artifact
+
+        :param key: Artifact key
+        :return: Location of the artifact file
+
+        """
+        return os.path.join(self.directory, key + STORE_SUFFIX)
+
+    def load(self, key):
+        """Method for loading an artifact
+
+        The arrays are mapped copy-on-write, so a model that is updated later does not change the file.
+
+        :param key: Artifact key
+        :return: Dictionary of name and fitted model or encoder, None when there is no usable artifact
+
+        """
+        location = self.get_location(key)
+        if not os.path.exists(location):
+            return None
+        try:
+            return joblib.load(location, mmap_mode='c')
+        except (OSError, EOFError, ValueError, KeyError, AttributeError, ImportError, pickle.UnpicklingError):
+            return None
+
+    def save(self, key, artifact):
+        """Method for saving an artifact, removing the artifacts of older keys
+
+        :param key: Artifact key
+        :param artifact: Dictionary of name and fitted model or encoder
+        :return: None
+
+        """
+        temporary = os.path.join(self.directory, key + '.tmp')
+        try:
+            joblib.dump(artifact, temporary)
+            os.replace(temporary, self.get_location(key))
+            for name in os.listdir(self.directory):
+                if name.endswith(STORE_SUFFIX) and name != key + STORE_SUFFIX:
+                    os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
@@ -0,0 +1,325 @@
+try:
+    # Import of Helper libraries
+    import re
+    import struct
+    import numpy as np
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+# Pcap magic numbers with the byte order and timestamp resolution they stand for
+PCAP_MAGIC = {
+    b'\xd4\xc3\xb2\xa1': ('<', 1e6),
+    b'\xa1\xb2\xc3\xd4': ('>', 1e6),
+    b'\x4d\x3c\xb2\xa1': ('<', 1e9),
+    b'\xa1\xb2\x3c\x4d': ('>', 1e9)
+}
+PCAP_HEADER_SIZE = 24
+RECORD_HEADER_SIZE = 16
+# Link types the raw decoder understands, everything else is left to scapy
+LINKTYPE_ETHERNET = 1
+SUPPORTED_LINKTYPES = (LINKTYPE_ETHERNET,)
+# Protocol numbers and ports used while decoding
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86dd
+ETHERTYPE_VLAN = (0x8100, 0x88a8)
+IPV6_EXTENSION_HEADERS = (0, 43, 60)
+IPV6_FRAGMENT_HEADER = 44
+PROTO_ICMP = 1
+PROTO_TCP = 6
+PROTO_UDP = 17
+DNS_UDP_PORTS = (53, 5353)
+DNS_TCP_PORTS = (53,)
+DNS_HEADER_SIZE = 12
+# Limits used to recognise a record header when searching from an arbitrary offset
+MAX_RECORD_SIZE = 262144
+RESYNC_DEPTH = 8
+# Protocol names used when /etc/protocols is not available
+DEFAULT_PROTOCOL_NAMES = {
+    0: 'hopopt', 1: 'icmp', 2: 'igmp', 4: 'ipencap', 6: 'tcp', 17: 'udp', 41: 'ipv6', 43: 'ipv6_route',
+    44: 'ipv6_frag', 47: 'gre', 50: 'esp', 51: 'ah', 58: 'ipv6_icmp', 59: 'ipv6_nonxt', 60: 'ipv6_opts',
+    88: 'eigrp', 89: 'ospf', 103: 'pim', 112: 'vrrp', 115: 'l2tp', 132: 'sctp', 136: 'udplite'
+}
+
+
+def load_protocol_names(filename='/etc/protocols'):
+    """Function for loading the names of all IP protocol numbers
+
+    The names are read the same way scapy reads them, so both decoders report the same protocol names.
+
+    :param filename: Location of the protocols file
+    :return: List of 256 protocol names, indexed by protocol number
+
+    """
+    names = dict(DEFAULT_PROTOCOL_NAMES)
+    try:
+        with open(filename, 'r', errors='backslashreplace') as f:
+            for line in f:
+                fields = line.split('#', 1)[0].split()
+                if len(fields) >= 2 and fields[1].isdigit() and int(fields[1]) < 256:
+                    names[int(fields[1])] = re.sub('[^a-zA-Z0-9_]', '_', fields[0]).lower()
+    except IOError:
+        pass
+    return list(names.get(number, str(number)) for number in range(256))
+
+
+PROTOCOL_NAMES = load_protocol_names()
+
+
+def ipv4_to_string(address):
+    """Function for formatting an IPv4 address stored as integer
+
+    :param address: IPv4 address as (unsigned) 32 bit integer
+    :return: IPv4 address in dotted notation as string
+
+    """
+    address = int(address)
+    return '{}.{}.{}.{}'.format(address >> 24, (address >> 16) & 0xff, (address >> 8) & 0xff, address & 0xff)
+
+
+def read_header(buf):
+    """Function for reading the global header of a pcap-file
+
+    :param buf: Buffer (bytes, mmap) containing the pcap-file
+    :return: Tuple of byte order, timestamp divisor, snapshot length and link type
+    :raises ValueError: When the buffer is not a classic pcap-file, for example a pcapng-file
+
+    """
+    if len(buf) < PCAP_HEADER_SIZE or bytes(buf[0:4]) not in PCAP_MAGIC:
+        raise ValueError('Not a pcap file')
+    endian, divisor = PCAP_MAGIC[bytes(buf[0:4])]
+    snaplen, linktype = struct.unpack_from(endian + 'II', buf, 16)
+    return endian, divisor, snaplen, linktype & 0x0fffffff
+
+
+def index_records(buf, endian, divisor, start=PCAP_HEADER_SIZE, end=None, limit=None):
+    """Function for walking the record headers of a pcap-file
+
+    Only the 16 byte record headers are read, the packet data itself is skipped. A record that is cut off by the
+    end of the buffer is ignored.
+
+    :param buf: Buffer (bytes, mmap) containing the pcap-file
+    :param endian: Byte order from the global header
+    :param divisor: Timestamp divisor from the global header
+    :param start: Offset of the first record header
+    :param end: Offset where reading stops, defaults to the end of the buffer
+    :param limit: Maximum amount of records to read, defaults to all records
+    :return: Tuple of data offsets, captured lengths, wire lengths, timestamps and the offset of the next record
+
+    """
+    if end is None:
+        end = len(buf)
+    unpack = struct.Struct(endian + 'IIII').unpack_from
+    offsets = []
+    seconds = []
+    fractions = []
+    caplens = []
+    wirelens = []
+    pos = start
+    while pos + RECORD_HEADER_SIZE <= end and (limit is None or len(offsets) < limit):
+        sec, frac, caplen, wirelen = unpack(buf, pos)
+        if pos + RECORD_HEADER_SIZE + caplen > len(buf):
+            break
+        offsets.append(pos + RECORD_HEADER_SIZE)
+        seconds.append(sec)
+        fractions.append(frac)
+        caplens.append(caplen)
+        wirelens.append(wirelen)
+        pos += RECORD_HEADER_SIZE + caplen
+    times = np.array(seconds, dtype=np.float64) + np.array(fractions, dtype=np.float64) / divisor
+    return (np.array(offsets, dtype=np.int64), np.array(caplens, dtype=np.int64),
+            np.array(wirelens, dtype=np.int64), times, pos)
+
+
+def decode_records(buf, offsets, caplens):
+    """Function for decoding the Ethernet, IP and transport headers of a set of records
+
+    All records are decoded at once with NumPy: every header field is gathered for all records in a single
+    array operation. The rules follow scapy's dissection, so the columns describe the same layers scapy would
+    find: VLAN tags are skipped, IPv4 fragments with an offset and IPv6 fragments after the first carry no
+    transport layer, and DNS is recognised on the ports scapy binds it to.
+
+    :param buf: Buffer (bytes, mmap) containing the pcap-file
+    :param offsets: Array of data offsets of the records
+    :param caplens: Array of captured lengths of the records
+    :return: Dictionary of NumPy columns, one entry per record
+
+    """
+    data = np.frombuffer(buf, dtype=np.uint8)
+    last = len(data) - 1
+    ends = offsets + caplens
+
+    def u8(pos):
+        return data[np.minimum(pos, last)].astype(np.int64)
+
+    def u16(pos):
+        return (u8(pos) << 8) | u8(pos + 1)
+
+    def u32(pos):
+        return (u16(pos) << 16) | u16(pos + 2)
+
+    def fits(pos, size):
+        return pos + size <= ends
+
+    # Ethernet, with up to two VLAN tags
+    ether = fits(offsets, 14)
+    ethertype = np.where(ether, u16(offsets + 12), -1)
+    l3 = offsets + 14
+    for _ in range(2):
+        vlan = np.isin(ethertype, ETHERTYPE_VLAN) & fits(l3, 4)
+        ethertype = np.where(vlan, u16(l3 + 2), ethertype)
+        l3 = np.where(vlan, l3 + 4, l3)
+    # IPv4
+    ip4 = (ethertype == ETHERTYPE_IPV4) & fits(l3, 20) & ((u8(l3) >> 4) == 4)
+    proto4 = u8(l3 + 9)
+    l4_ip4 = l3 + (u8(l3) & 0x0f) * 4
+    transport4 = ip4 & ((u16(l3 + 6) & 0x1fff) == 0)
+    # IPv6, skipping the extension headers scapy dissects
+    ip6 = (ethertype == ETHERTYPE_IPV6) & fits(l3, 40) & ((u8(l3) >> 4) == 6)
+    next_header = u8(l3 + 6)
+    l4_ip6 = l3 + 40
+    transport6 = ip6.copy()
+    for _ in range(2):
+        extension = transport6 & np.isin(next_header, IPV6_EXTENSION_HEADERS) & fits(l4_ip6, 8)
+        fragment = transport6 & (next_header == IPV6_FRAGMENT_HEADER) & fits(l4_ip6, 8)
+        transport6 &= ~fragment | ((u16(l4_ip6 + 2) >> 3) == 0)
+        skip = np.where(extension, (u8(l4_ip6 + 1) + 1) * 8, np.where(fragment, 8, 0))
+        next_header = np.where(extension | fragment, u8(l4_ip6), next_header)
+        l4_ip6 = l4_ip6 + skip
+    # Transport layer
+    proto = np.where(ip4, proto4, np.where(ip6, next_header, -1))
+    transport = transport4 | transport6
+    l4 = np.where(ip4, l4_ip4, l4_ip6)
+    tcp = transport & (proto == PROTO_TCP) & fits(l4, 20)
+    udp = transport & (proto == PROTO_UDP) & fits(l4, 8)
+    icmp = transport4 & (proto == PROTO_ICMP) & fits(l4, 8)
+    has_ports = tcp | udp
+    sport = np.where(has_ports, u16(l4), 0)
+    dport = np.where(has_ports, u16(l4 + 2), 0)
+    payload = np.where(tcp, l4 + (u8(l4 + 12) >> 4) * 4, l4 + 8)
+    dns = fits(payload, DNS_HEADER_SIZE) & (
+        (udp & (np.isin(sport, DNS_UDP_PORTS) | np.isin(dport, DNS_UDP_PORTS))) |
+        (tcp & (np.isin(sport, DNS_TCP_PORTS) | np.isin(dport, DNS_TCP_PORTS)))
+    )
+    # Addresses
+    src6 = np.zeros(len(offsets), dtype='S16')
+    dst6 = np.zeros(len(offsets), dtype='S16')
+    if ip6.any():
+        rows = l3[ip6][:, None] + np.arange(16)
+        src6[ip6] = data[np.minimum(rows + 8, last)].copy().view('S16').ravel()
+        dst6[ip6] = data[np.minimum(rows + 24, last)].copy().view('S16').ravel()
+    return {
+        'ether': ether,
+        'ip4': ip4,
+        'ip6': ip6,
+        'proto': np.where(proto >= 0, proto, 0).astype(np.uint8),
+        'src4': np.where(ip4, u32(l3 + 12), 0).astype(np.uint32),
+        'dst4': np.where(ip4, u32(l3 + 16), 0).astype(np.uint32),
+        'src6': src6,
+        'dst6': dst6,
+        'sport': sport.astype(np.uint16),
+        'dport': dport.astype(np.uint16),
+        'tcp': tcp,
+        'udp': udp,
+        'dns': dns,
+        'icmp': icmp
+    }
+
+
+def iter_batches(buf, batch_size=65536, start=PCAP_HEADER_SIZE, end=None):
+    """Generator function for decoding a pcap-file in batches of records
+
+    Each batch is a dictionary of NumPy columns holding the record header fields ('time', 'caplen', 'wirelen')
+    and the decoded header fields of decode_records. Memory use depends on the batch size, not on the size of
+    the file.
+
+    :param buf: Buffer (bytes, mmap) containing the pcap-file
+    :param batch_size: Amount of records per batch
+    :param start: Offset of the first record header to decode
+    :param end: Offset where decoding stops, defaults to the end of the buffer
+    :return: Generator of column dictionaries
+    :raises ValueError: When the file is not a pcap-file or its link type is not supported
+
+    """
+    endian, divisor, snaplen, linktype = read_header(buf)
+    if linktype not in SUPPORTED_LINKTYPES:
+        raise ValueError('Unsupported link type: ' + str(linktype))
+    pos = start
+    while True:
+        offsets, caplens, wirelens, times, pos = index_records(buf, endian, divisor, pos, end, batch_size)
+        if len(offsets) == 0:
+            return
+        batch = decode_records(buf, offsets, caplens)
+        batch['time'] = times
+        batch['caplen'] = caplens
+        batch['wirelen'] = wirelens
+        yield batch
+
+
+def is_record_start(buf, pos, endian, divisor, snaplen, first_second, depth=RESYNC_DEPTH):
+    """Function for checking if a record header starts at an offset
+
+    The header at the offset and the headers following it must all look valid: a fraction below the timestamp
+    resolution, a captured length within the snapshot length and not above the wire length, and a timestamp that
+    is not before the first record of the file. The check succeeds when the chain reaches the end of the buffer.
+
+    :param buf: Buffer (bytes, mmap) containing the pcap-file
+    :param pos: Offset to check
+    :param endian: Byte order from the global header
+    :param divisor: Timestamp divisor from the global header
+    :param snaplen: Snapshot length from the global header
+    :param first_second: Timestamp in seconds of the first record of the file
+    :param depth: Amount of consecutive headers that have to be valid
+    :return: Boolean if a record header starts at the offset
+
+    """
+    unpack = struct.Struct(endian + 'IIII').unpack_from
+    max_caplen = max(snaplen, MAX_RECORD_SIZE)
+    for _ in range(depth):
+        if pos == len(buf):
+            return True
+        if pos + RECORD_HEADER_SIZE > len(buf):
+            return False
+        sec, frac, caplen, wirelen = unpack(buf, pos)
+        if frac >= divisor or caplen > max_caplen or caplen > wirelen or sec + 86400 < first_second:
+            return False
+        pos += RECORD_HEADER_SIZE + caplen
+    return pos <= len(buf)
+
+
+def split_records(buf, parts):
+    """Function for splitting a pcap-file into byte ranges that start and end on record boundaries
+
+    The file is cut into parts of equal size, after which every cut is moved forward to the next record header.
+
+    :param buf: Buffer (bytes, mmap) containing the pcap-file
+    :param parts: Amount of ranges to make
+    :return: List of (start, end) offset tuples covering all records, empty ranges are left out
+
+    """
+    endian, divisor, snaplen, linktype = read_header(buf)
+    if len(buf) < PCAP_HEADER_SIZE + RECORD_HEADER_SIZE:
+        return []
+    first_second = struct.unpack_from(endian + 'I', buf, PCAP_HEADER_SIZE)[0]
+    size = (len(buf) - PCAP_HEADER_SIZE) // parts
+    cuts = [PCAP_HEADER_SIZE]
+    for part in range(1, parts):
+        pos = max(PCAP_HEADER_SIZE + part * size, cuts[-1])
+        while pos < len(buf) and not is_record_start(buf, pos, endian, divisor, snaplen, first_second):
+            pos += 1
+        cuts.append(pos)
+    cuts.append(len(buf))
+    return list((start, end) for start, end in zip(cuts, cuts[1:]) if start < end)
+
+
+def is_supported(buf):
+    """Function for checking if the raw decoder can handle a pcap-file
+
+    :param buf: Buffer (bytes, mmap) containing the pcap-file
+    :return: Boolean if the file is a classic pcap-file with a supported link type
+
+    """
+    try:
+        return read_header(buf)[3] in SUPPORTED_LINKTYPES
+    except ValueError:
+        return False
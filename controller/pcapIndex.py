@@ -0,0 +1,219 @@
+try:
+    from controller import pcapDecoder
+    # Import of Helper libraries
+    import os
+    import mmap
+    import struct
+    import numpy as np
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+# Layout of the sidecar file: a fixed header followed by one entry per record
+INDEX_SUFFIX = '.idx'
+INDEX_MAGIC = b'PCAPIDX1'
+INDEX_HEADER = struct.Struct('<8sQqQ')
+INDEX_DTYPE = np.dtype([('offset', '<i8'), ('time', '<f8'), ('caplen', '<u4'), ('wirelen', '<u4')])
+# Amount of record headers read at once while building an index
+BUILD_BATCH_SIZE = 1048576
+
+
+class PcapIndex:
+    """Pcap index class
+
+    The index holds the file offset, timestamp and captured length of every record of a pcap-file. It is kept in a
+    sidecar file next to the capture, so a capture that was looked at before can be re-analysed or sliced by time
+    without walking the record headers again. The pcap-file itself is memory-mapped and the records are decoded
+    straight from it.
+
+    """
+    location = ""
+    buf = None
+    records = None
+    # True when the timestamps of the records never decrease
+    ordered = True
+
+    def __init__(self, location, records):
+        """Constructor method for making a pcap index
+
+        :param location: Location of the pcap-file
+        :param records: Structured array (or memmap) of INDEX_DTYPE entries, one per record
+
+        """
+        self.location = location
+        self.records = records
+        # Captures are not always in time order, merged captures or captures of several NIC queues for example
+        self.ordered = bool(np.all(records['time'][1:] >= records['time'][:-1]))
+        with open(location, 'rb') as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def open(location):
+        """Method for opening the index of a pcap-file, building and saving it when it is missing or outdated
+
+        :param location: Location of the pcap-file
+        :return: PcapIndex instance
+
+        """
+        records = PcapIndex.load_sidecar(location)
+        if records is None:
+            records = PcapIndex.build(location)
+            PcapIndex.save_sidecar(location, records)
+        return PcapIndex(location, records)
+
+    @staticmethod
+    def build(location):
+        """Method for building the index of a pcap-file by walking its record headers once
+
+        :param location: Location of the pcap-file
+        :return: Structured array of INDEX_DTYPE entries
+        :raises ValueError: When the file is not a classic pcap-file
+
+        """
+        parts = []
+        with open(location, 'rb') as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                endian, divisor, snaplen, linktype = pcapDecoder.read_header(buf)
+                pos = pcapDecoder.PCAP_HEADER_SIZE
+                while True:
+                    offsets, caplens, wirelens, times, pos = pcapDecoder.index_records(buf, endian, divisor, pos,
+                                                                                       limit=BUILD_BATCH_SIZE)
+                    if len(offsets) == 0:
+                        break
+                    part = np.empty(len(offsets), dtype=INDEX_DTYPE)
+                    part['offset'] = offsets
+                    part['time'] = times
+                    part['caplen'] = caplens
+                    part['wirelen'] = wirelens
+                    parts.append(part)
+            finally:
+                buf.close()
+        if not parts:
+            return np.empty(0, dtype=INDEX_DTYPE)
+        return np.concatenate(parts)
+
+    @staticmethod
+    def load_sidecar(location):
+        """Method for memory-mapping the sidecar index of a pcap-file
+
+        :param location: Location of the pcap-file
+        :return: Memmap of INDEX_DTYPE entries, None when there is no valid sidecar for the current file, also when
+                 the sidecar is truncated
+
+        """
+        try:
+            stat = os.stat(location)
+            with open(location + INDEX_SUFFIX, 'rb') as f:
+                magic, size, mtime, count = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+        except (OSError, struct.error):
+            return None
+        if magic != INDEX_MAGIC or size != stat.st_size or mtime != stat.st_mtime_ns:
+            return None
+        if count == 0:
+            return np.empty(0, dtype=INDEX_DTYPE)
+        try:
+            return np.memmap(location + INDEX_SUFFIX, dtype=INDEX_DTYPE, mode='r', offset=INDEX_HEADER.size,
+                             shape=(count,))
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def save_sidecar(location, records):
+        """Method for writing the sidecar index of a pcap-file
+
+        The index is written to a temporary file first and then moved in place. When the directory is not
+        writable the index is only kept in memory.
+
+        :param location: Location of the pcap-file
+        :param records: Structured array of INDEX_DTYPE entries
+        :return: Boolean if the sidecar was written
+
+        """
+        temporary = location + INDEX_SUFFIX + '.tmp'
+        try:
+            stat = os.stat(location)
+            with open(temporary, 'wb') as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(records)))
+                f.write(np.ascontiguousarray(records).tobytes())
+            os.replace(temporary, location + INDEX_SUFFIX)
+            return True
+        except OSError:
+            return False
+
+    def __len__(self):
+        """Method for getting the amount of records in the index
+
+        :return: Amount of records as integer
+
+        """
+        return len(self.records)
+
+    def close(self):
+        """Method for closing the memory map of the pcap-file
+
+        :return: None
+
+        """
+        self.buf.close()
+
+    def time_slice(self, start_time, end_time):
+        """Method for finding the records captured within a time window
+
+        When the timestamps of the records never decrease, both ends of the window are found with a binary search
+        instead of comparing every timestamp. Otherwise every timestamp is compared.
+
+        :param start_time: Start of the window as timestamp in seconds
+        :param end_time: End of the window (exclusive) as timestamp in seconds
+        :return: Array of record numbers within the window
+
+        """
+        times = self.records['time']
+        if not self.ordered:
+            return np.flatnonzero((times >= start_time) & (times < end_time))
+        first, last = np.searchsorted(times, [start_time, end_time], side='left')
+        return np.arange(first, max(first, last), dtype=np.int64)
+
+    def byte_range(self, first, last):
+        """Method for getting the byte range of the records first up to (not including) last
+
+        :param first: Number of the first record
+        :param last: Number of the record after the last one
+        :return: Tuple of start and end offset, on record boundaries
+
+        """
+        if first >= last:
+            return pcapDecoder.PCAP_HEADER_SIZE, pcapDecoder.PCAP_HEADER_SIZE
+        start = int(self.records['offset'][first]) - pcapDecoder.RECORD_HEADER_SIZE
+        return start, int(self.records['offset'][last - 1]) + int(self.records['caplen'][last - 1])
+
+    def split(self, parts):
+        """Method for splitting the records into byte ranges with about the same amount of records
+
+        :param parts: Amount of ranges to make
+        :return: List of (start, end) offset tuples, empty ranges are left out
+
+        """
+        cuts = np.linspace(0, len(self), parts + 1).astype(np.int64)
+        return list(self.byte_range(first, last) for first, last in zip(cuts, cuts[1:]) if first < last)
+
+    def iter_batches(self, records=None, batch_size=65536):
+        """Generator method for decoding records in batches, using the index instead of the record headers
+
+        :param records: Array of record numbers to decode, defaults to all records
+        :param batch_size: Amount of records per batch
+        :return: Generator of column dictionaries as made by pcapDecoder.iter_batches
+        :raises ValueError: When the link type of the file is not supported
+
+        """
+        if pcapDecoder.read_header(self.buf)[3] not in pcapDecoder.SUPPORTED_LINKTYPES:
+            raise ValueError('Unsupported link type')
+        entries = self.records if records is None else self.records[records]
+        for first in range(0, len(entries), batch_size):
+            part = entries[first:first + batch_size]
+            caplens = part['caplen'].astype(np.int64)
+            batch = pcapDecoder.decode_records(self.buf, part['offset'].astype(np.int64), caplens)
+            batch['time'] = part['time'].astype(np.float64)
+            batch['caplen'] = caplens
+            batch['wirelen'] = part['wirelen'].astype(np.int64)
+            yield batch
@@ -0,0 +1,203 @@
+try:
+    from model import statsModel
+    from controller import pcapDecoder
+    from controller import flowTable
+    # Import of Helper libraries
+    import mmap
+    from array import array
+    from collections import Counter
+    import numpy as np
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+# Amount of packets added one by one that are kept before they are added to the byte series at once
+PENDING_PACKETS = 65536
+
+
+class StatsAccumulator:
+    """Statistics accumulator class
+
+    The accumulator collects everything needed for a StatsInstance while the packets of a pcap-file are being read,
+    so a capture can be analysed in one pass without keeping the packets themselves in memory. Addresses and
+    protocols are kept as tallies, the bytes sent over time as a byte series of at most SERIES_MAX_BINS intervals
+    and the flows in a flow table that drops idle flows, so the memory use does not grow with the capture.
+
+    """
+    tcp_count = 0
+    udp_count = 0
+    dns_count = 0
+    icmp_count = 0
+    first_time = None
+    last_time = None
+    packet_count = 0
+    # Amount of flows handed to the statistics model
+    top_flows = 100
+
+    def __init__(self):
+        """Constructor method for making an empty statistics accumulator"""
+        self.src_tally = Counter()
+        self.dst_tally = Counter()
+        self.protocol_tally = Counter()
+        self.byte_series = statsModel.ByteSeries()
+        # Times and lengths of the Ethernet packets added one by one, not yet in the byte series
+        self.pending_times = array('d')
+        self.pending_lengths = array('q')
+        self.flows = flowTable.FlowTable()
+
+    def add_packet(self, time, wirelen, src, dst, proto, is_tcp, is_udp, is_dns, is_icmp, flow=None):
+        """Method for adding the values of a single packet to the accumulator
+
+        :param time: Capture timestamp of the packet in seconds as float
+        :param wirelen: Length of the Ethernet frame on the wire, None if the packet has no Ethernet layer
+        :param src: Source IP address as string, None if the packet has no IP layer
+        :param dst: Destination IP address as string, None if the packet has no IP layer
+        :param proto: Name of the IP protocol as string, None if the packet has no IP layer
+        :param is_tcp: Boolean if the packet contains a TCP layer
+        :param is_udp: Boolean if the packet contains a UDP layer
+        :param is_dns: Boolean if the packet contains a DNS layer
+        :param is_icmp: Boolean if the packet contains an ICMP layer
+        :param flow: Tuple of source and destination address, ports, IP protocol number and packet length for IPv4
+                     and IPv6 packets, None for other packets
+        :return: None
+
+        """
+        if self.first_time is None:
+            self.first_time = time
+        self.last_time = time
+        self.packet_count += 1
+        self.tcp_count += is_tcp
+        self.udp_count += is_udp
+        self.dns_count += is_dns
+        self.icmp_count += is_icmp
+        if src is not None:
+            self.src_tally[src] += 1
+            self.dst_tally[dst] += 1
+            self.protocol_tally[proto] += 1
+        if wirelen is not None:
+            self.pending_times.append(time)
+            self.pending_lengths.append(wirelen)
+            if len(self.pending_times) >= PENDING_PACKETS:
+                self.flush()
+        if flow is not None:
+            self.flows.add_packet(*flow, time)
+
+    def add_batch(self, batch):
+        """Method for adding a batch of decoded packets to the accumulator
+
+        :param batch: Dictionary of NumPy columns as made by pcapDecoder.iter_batches
+        :return: None
+
+        """
+        times = batch['time']
+        if len(times) == 0:
+            return
+        if self.first_time is None:
+            self.first_time = float(times[0])
+        self.last_time = float(times[-1])
+        self.packet_count += len(times)
+        self.tcp_count += int(np.count_nonzero(batch['tcp']))
+        self.udp_count += int(np.count_nonzero(batch['udp']))
+        self.dns_count += int(np.count_nonzero(batch['dns']))
+        self.icmp_count += int(np.count_nonzero(batch['icmp']))
+        ip4 = batch['ip4']
+        for tally, addresses in ((self.src_tally, batch['src4'][ip4]), (self.dst_tally, batch['dst4'][ip4])):
+            values, counts = np.unique(addresses, return_counts=True)
+            for value, count in zip(values, counts):
+                tally[pcapDecoder.ipv4_to_string(value)] += int(count)
+        protocols = np.bincount(batch['proto'][ip4], minlength=256)
+        for number in np.flatnonzero(protocols):
+            self.protocol_tally[pcapDecoder.PROTOCOL_NAMES[number]] += int(protocols[number])
+        ether = batch['ether']
+        self.byte_series.add(times[ether], batch['wirelen'][ether])
+        self.flows.add_batch(batch)
+
+    def merge(self, other):
+        """Method for merging the accumulator of a later part of the same capture into this one
+
+        Counts, tallies and byte series are added up. Flows continuing over the border of both parts are joined.
+
+        :param other: StatsAccumulator of the packets following the packets of this accumulator
+        :return: None
+
+        """
+        if other.first_time is None:
+            return
+        if self.first_time is None:
+            self.first_time = other.first_time
+        self.last_time = other.last_time
+        self.packet_count += other.packet_count
+        self.tcp_count += other.tcp_count
+        self.udp_count += other.udp_count
+        self.dns_count += other.dns_count
+        self.icmp_count += other.icmp_count
+        self.src_tally.update(other.src_tally)
+        self.dst_tally.update(other.dst_tally)
+        self.protocol_tally.update(other.protocol_tally)
+        other.flush()
+        self.byte_series.merge(other.byte_series)
+        self.flows.merge(other.flows)
+
+    def get_total_time(self):
+        """Getter method for the total session time of the accumulated packets
+
+        :return: Time between the first and the last packet in seconds
+
+        """
+        if self.first_time is None:
+            return 0
+        return self.last_time - self.first_time
+
+    def flush(self):
+        """Method for adding the packets that were added one by one to the byte series
+
+        :return: None
+
+        """
+        if len(self.pending_times) > 0:
+            self.byte_series.add(np.frombuffer(self.pending_times, dtype=np.float64),
+                                 np.frombuffer(self.pending_lengths, dtype=np.int64))
+            self.pending_times = array('d')
+            self.pending_lengths = array('q')
+
+    def to_stats_instance(self, filename):
+        """Method for turning the accumulated values into a statistics model instance
+
+        :param filename: Filename of the loaded pcap file
+        :return: Statistical Model instance
+
+        """
+        self.flush()
+        addresses = sorted(set(self.src_tally) | set(self.dst_tally))
+        src_counts, dst_counts = (np.array(list(tally.get(address, 0) for address in addresses), dtype=np.int64)
+                                  for tally in (self.src_tally, self.dst_tally))
+        protocol_table = list(self.protocol_tally)
+        protocol_counts = np.array(list(self.protocol_tally.values()), dtype=np.int64)
+        return statsModel.StatsInstance(self.tcp_count, self.udp_count, self.dns_count, self.icmp_count,
+                                        list(statsModel.pack_address(address) for address in addresses),
+                                        src_counts, dst_counts, protocol_table, protocol_counts, self.byte_series,
+                                        self.first_time or 0.0, self.get_total_time(), filename, self.packet_count,
+                                        self.flows.top(self.top_flows, self.first_time or 0.0),
+                                        self.flows.flow_count)
+
+
+def accumulate_range(location, start, end):
+    """Function for accumulating the statistics of a byte range of a pcap-file
+
+    This function runs in the worker processes of the parallel mode, each worker maps the file itself.
+
+    :param location: Location of the pcap-file
+    :param start: Offset of the first record header of the range
+    :param end: Offset of the end of the range, on a record boundary
+    :return: StatsAccumulator of the records in the range
+
+    """
+    accumulator = StatsAccumulator()
+    with open(location, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for batch in pcapDecoder.iter_batches(buf, start=start, end=end):
+                accumulator.add_batch(batch)
+        finally:
+            buf.close()
+    return accumulator
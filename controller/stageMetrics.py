@@ -0,0 +1,218 @@
+try:
+    # Import of Helper libraries
+    import bisect
+    import threading
+    import time
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+# Upper bounds in seconds of the latency histogram buckets, a +Inf bucket follows the last bound
+DEFAULT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+METRIC_PREFIX = 'spinehome'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class StageTimer:
+    """Stage timer class
+
+    A stage timer adds up the time spent in one stage, as a context manager around every piece of work of the
+    stage or around the items of an iterable, and records the total as one observation. Timers made with once=True
+    record every block on its own when it ends.
+
+    """
+    seconds = 0.0
+    once = False
+
+    def __init__(self, metrics, stage, once=False):
+        """Constructor method for making a stage timer
+
+        :param metrics: StageMetrics the time is recorded in
+        :param stage: Name of the stage
+        :param once: True to record the time when the block ends, instead of with record
+
+        """
+        self.metrics = metrics
+        self.stage = stage
+        self.once = once
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.seconds += time.perf_counter() - self.start
+        if self.once:
+            self.record()
+
+    def iterate(self, iterable):
+        """Method for adding the time spent making every item of an iterable to the stage
+
+        :param iterable: Iterable to time, for example a packet reader or a batch generator
+        :return: Generator of the items of the iterable
+
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.seconds += time.perf_counter() - start
+                return
+            self.seconds += time.perf_counter() - start
+            yield item
+
+    def record(self):
+        """Method for recording the time added up so far as one observation and starting again
+
+        :return: None
+
+        """
+        self.metrics.observe(self.stage, self.seconds)
+        self.seconds = 0.0
+
+
+class NullTimer:
+    """Null timer class
+
+    Stand-in for the stage timer while the metrics are disabled, every method does nothing.
+
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+    @staticmethod
+    def iterate(iterable):
+        return iterable
+
+    def record(self):
+        return None
+
+
+NULL_TIMER = NullTimer()
+
+
+class StageMetrics:
+    """Stage metrics class
+
+    The stage metrics keep a latency histogram of every stage (reading and dissecting captures, aggregating the
+    statistics, encoding, predicting, building figures) and counters of events, and render them in the Prometheus
+    text format. While the metrics are disabled the timers are a shared null timer, so an instrumented stage only
+    costs a method call.
+
+    """
+    enabled = False
+    buckets = DEFAULT_BUCKETS
+
+    def __init__(self, enabled=False, buckets=DEFAULT_BUCKETS):
+        """Constructor method for making a metrics registry
+
+        :param enabled: True to record the metrics
+        :param buckets: Sorted upper bounds in seconds of the histogram buckets
+
+        """
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.histograms = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def time(self, stage):
+        """Method for timing a block of code as one observation of a stage
+
+        :param stage: Name of the stage
+        :return: Context manager timing the block
+
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        return StageTimer(self, stage, True)
+
+    def timer(self, stage):
+        """Method for making a timer that adds up the time of a stage over several blocks or items
+
+        :param stage: Name of the stage
+        :return: Stage timer, its record method records the total as one observation
+
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        return StageTimer(self, stage)
+
+    def observe(self, stage, seconds):
+        """Method for recording one latency of a stage
+
+        :param stage: Name of the stage
+        :param seconds: Latency in seconds
+        :return: None
+
+        """
+        if not self.enabled:
+            return
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = [[0] * (len(self.buckets) + 1), 0.0]
+            histogram[0][index] += 1
+            histogram[1] += seconds
+
+    def count(self, event, amount=1):
+        """Method for adding to the counter of an event
+
+        :param event: Name of the event
+        :param amount: Amount to add
+        :return: None
+
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[event] = self.counters.get(event, 0) + amount
+
+    def reset(self):
+        """Method for removing all recorded metrics
+
+        :return: None
+
+        """
+        with self.lock:
+            self.histograms = {}
+            self.counters = {}
+
+    def render(self):
+        """Method for rendering all metrics in the Prometheus text format
+
+        :return: Metrics as string
+
+        """
+        with self.lock:
+            histograms = dict((stage, (list(counts), total)) for stage, (counts, total) in self.histograms.items())
+            counters = dict(self.counters)
+        name = METRIC_PREFIX + '_stage_seconds'
+        lines = ['# HELP {} Time spent in every stage in seconds.'.format(name),
+                 '# TYPE {} histogram'.format(name)]
+        bounds = list(repr(float(bound)) for bound in self.buckets) + ['+Inf']
+        for stage in sorted(histograms):
+            counts, total = histograms[stage]
+            cumulative = 0
+            for bound, amount in zip(bounds, counts):
+                cumulative += amount
+                lines.append('{}_bucket{{stage="{}",le="{}"}} {}'.format(name, stage, bound, cumulative))
+            lines.append('{}_sum{{stage="{}"}} {!r}'.format(name, stage, total))
+            lines.append('{}_count{{stage="{}"}} {}'.format(name, stage, cumulative))
+        name = METRIC_PREFIX + '_events_total'
+        lines += ['# HELP {} Amount of every event.'.format(name), '# TYPE {} counter'.format(name)]
+        for event in sorted(counters):
+            lines.append('{}{{event="{}"}} {}'.format(name, event, counters[event]))
+        return '\n'.join(lines) + '\n'
+
+
+# Metrics of this process, enabled by the controller with the STAGE_METRICS setting
+REGISTRY = StageMetrics()
@@ -0,0 +1,171 @@
+try:
+    # Import of Helper libraries
+    import os
+    import copy
+    import pickle
+    import hashlib
+    import threading
+    from collections import OrderedDict
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+# Version of the cached statistics, change it when the StatsInstance layout changes so old entries are skipped
+CACHE_VERSION = 'stats-5'
+CACHE_SUFFIX = '.pkl'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class StatsCache:
+    """Statistics cache class
+
+    The cache keeps computed StatsInstance results keyed by a hash of the capture contents. The first tier is an
+    in-process LRU cache limited by the pickled size of the entries, the second tier a folder of pickled results
+    limited by total size, which survives restarts. A capture that was analysed before is returned straight from
+    the cache, whatever its filename.
+
+    """
+    directory = ""
+    max_memory = 0
+    max_disk = 0
+    memory_size = 0
+
+    def __init__(self, directory, max_memory, max_disk):
+        """Constructor method for making a statistics cache
+
+        :param directory: Folder for the on-disk tier, an empty string disables the on-disk tier
+        :param max_memory: Largest total size in bytes of the in-process tier
+        :param max_disk: Largest total size in bytes of the on-disk tier
+
+        """
+        self.directory = directory
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key_for_buffer(buf):
+        """Method for making the cache key of a capture held in a buffer
+
+        :param buf: Buffer (bytes, memoryview, mmap) containing the capture
+        :return: Cache key as hexadecimal string
+
+        """
+        digest = hashlib.sha256(CACHE_VERSION.encode())
+        digest.update(buf)
+        return digest.hexdigest()
+
+    @staticmethod
+    def key_for_file(location):
+        """Method for making the cache key of a capture file, reading it in chunks
+
+        :param location: Location of the capture file
+        :return: Cache key as hexadecimal string
+
+        """
+        digest = hashlib.sha256(CACHE_VERSION.encode())
+        with open(location, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(self, key, filename):
+        """Method for getting cached statistics
+
+        :param key: Cache key of the capture
+        :param filename: Filename to show with the statistics, the capture may have been cached under another name
+        :return: Statistical Model instance, None when the capture is not cached
+
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                stats = entry[0]
+        if entry is None:
+            stats = self.load(key)
+            if stats is None:
+                return None
+        stats = copy.copy(stats)
+        stats.filename = filename
+        return stats
+
+    def put(self, key, stats):
+        """Method for adding computed statistics to both tiers of the cache
+
+        :param key: Cache key of the capture
+        :param stats: Statistical Model instance
+        :return: None
+
+        """
+        data = pickle.dumps(stats, protocol=pickle.HIGHEST_PROTOCOL)
+        self.remember(key, stats, len(data))
+        if self.directory:
+            temporary = os.path.join(self.directory, key + '.tmp')
+            try:
+                with open(temporary, 'wb') as f:
+                    f.write(data)
+                os.replace(temporary, os.path.join(self.directory, key + CACHE_SUFFIX))
+                self.evict_disk()
+            except OSError:
+                pass
+
+    def remember(self, key, stats, size):
+        """Method for adding statistics to the in-process tier, evicting the least recently used entries
+
+        :param key: Cache key of the capture
+        :param stats: Statistical Model instance
+        :param size: Pickled size of the statistics in bytes
+        :return: None
+
+        """
+        if size > self.max_memory:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.memory_size -= self.entries.pop(key)[1]
+            self.entries[key] = (stats, size)
+            self.memory_size += size
+            while self.memory_size > self.max_memory:
+                self.memory_size -= self.entries.popitem(last=False)[1][1]
+
+    def load(self, key):
+        """Method for loading statistics from the on-disk tier into the in-process tier
+
+        :param key: Cache key of the capture
+        :return: Statistical Model instance, None when the capture is not on disk
+
+        """
+        if not self.directory:
+            return None
+        location = os.path.join(self.directory, key + CACHE_SUFFIX)
+        try:
+            with open(location, 'rb') as f:
+                data = f.read()
+            os.utime(location)
+            stats = pickle.loads(data)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        self.remember(key, stats, len(data))
+        return stats
+
+    def evict_disk(self):
+        """Method for removing the least recently used files of the on-disk tier until it fits its limit
+
+        :return: None
+
+        """
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(CACHE_SUFFIX):
+                stat = os.stat(os.path.join(self.directory, name))
+                files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_disk:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
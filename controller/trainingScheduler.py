@@ -0,0 +1,116 @@
+try:
+    # Import of Helper libraries
+    import os
+    import time
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+
+def fit_model(model, values, labels=None):
+    """Function for fitting a model and timing the fit
+
+    This function runs in the worker processes of the training scheduler.
+
+    :param model: Unfitted model
+    :param values: Training values
+    :param labels: Training labels, None for the clustering models
+    :return: Tuple of the fitted model and the seconds the fit took
+
+    """
+    start = time.time()
+    if labels is None:
+        model.fit(values)
+    else:
+        model.fit(values, labels)
+    return model, time.time() - start
+
+
+def get_context(modules):
+    """Function for getting the multiprocessing context of the worker processes
+
+    The scheduler runs in the training thread and the parallel pcap mode in the threads of the app server, while
+    the other threads are running. A forked worker would copy locks held by those threads. The workers are started
+    by a fork server (or spawned where there is none) instead, which imports the given modules once so every worker
+    has them already.
+
+    :param modules: List of the names of the modules the workers need
+    :return: Multiprocessing context
+
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(modules)
+    return context
+
+
+class TrainingScheduler:
+    """Training scheduler class
+
+    The training scheduler fits independent models at the same time, each in its own worker process, and hands
+    back every fitted model as soon as it is done together with the time its fit took. With one worker the models
+    are fitted one after another in this process. The workers are not forked from this process, see get_context.
+
+    """
+    workers = 1
+
+    def __init__(self, workers=0):
+        """Constructor method for making a training scheduler
+
+        :param workers: Amount of worker processes, 0 uses all cores
+
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.jobs = []
+
+    def add(self, name, model, values, labels=None):
+        """Method for adding a model to fit
+
+        :param name: Name of the model
+        :param model: Unfitted model
+        :param values: Training values
+        :param labels: Training labels, None for the clustering models
+        :return: None
+
+        """
+        self.jobs.append((name, model, values, labels))
+
+    def get_model_jobs(self, jobs, models):
+        """Getter method for the n_jobs to give every model fitted by this scheduler
+
+        Every worker process running a model with n_jobs=-1 would start a thread per core, so with several workers
+        the cores are shared between them instead.
+
+        :param jobs: Wanted n_jobs of a model, negative numbers count back from all cores as in joblib
+        :param models: Amount of models that will be fitted
+        :return: n_jobs for every model as integer
+
+        """
+        cores = os.cpu_count() or 1
+        if jobs < 0:
+            jobs = max(cores + 1 + jobs, 1)
+        workers = min(self.workers, models)
+        if workers > 1:
+            jobs = min(jobs, max(cores // workers, 1))
+        return jobs
+
+    def run(self):
+        """Method for fitting all added models
+
+        :return: Generator of tuples of name, fitted model and seconds the fit took, in the order the fits finish
+
+        """
+        jobs, self.jobs = self.jobs, []
+        if self.workers == 1 or len(jobs) == 1:
+            for name, model, values, labels in jobs:
+                yield (name,) + fit_model(model, values, labels)
+            return
+        context = get_context(sorted(set(type(model).__module__ for _, model, _, _ in jobs)))
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs)), mp_context=context) as pool:
+            futures = dict((pool.submit(fit_model, model, values, labels), name)
+                           for name, model, values, labels in jobs)
+            for future in as_completed(futures):
+                yield (futures[future],) + future.result()
@@ -0,0 +1,87 @@
+try:
+    # Import of Helper libraries
+    import io
+    import mmap
+    import base64
+    import tempfile
+except ImportError as e:
+    print("Libraries are not installed: " + e.__str__())
+    exit()
+
+# Amount of base64 characters decoded at once, a multiple of 4 so every chunk decodes on its own
+DECODE_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class UploadBuffer:
+    """Upload buffer class
+
+    The upload buffer decodes the base64 contents of a Dash upload chunk by chunk into a spooled buffer. Small
+    uploads stay in memory, uploads larger than the spool size are written to a temporary file, which is then
+    memory-mapped. Either way the decoded bytes are available as a buffer for the raw decoder, and open_file gives
+    scapy a file object of its own, which scapy may close without touching the buffer.
+
+    """
+    file = None
+    buf = None
+    location = None
+
+    def __init__(self, contents, max_memory):
+        """Constructor method for decoding an upload into a buffer
+
+        :param contents: Contents of the upload component as data URI ('data:<type>;base64,<data>')
+        :param max_memory: Largest decoded size in bytes that is kept in memory
+        :raises ValueError: When the contents are not base64 encoded
+
+        """
+        comma = contents.find(',')
+        if comma < 0 or not contents[:comma].endswith(';base64'):
+            raise ValueError('Upload is not base64 encoded')
+        if (len(contents) - comma - 1) // 4 * 3 <= max_memory:
+            self.file = io.BytesIO()
+        else:
+            self.file = tempfile.NamedTemporaryFile(suffix='.pcap')
+            self.location = self.file.name
+        for pos in range(comma + 1, len(contents), DECODE_CHUNK_SIZE):
+            self.file.write(base64.b64decode(contents[pos:pos + DECODE_CHUNK_SIZE]))
+        self.file.flush()
+        size = self.file.tell()
+        self.file.seek(0)
+        if self.location is None:
+            self.buf = self.file.getbuffer()
+        elif size > 0:
+            self.buf = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.buf = b''
+
+    def __len__(self):
+        """Method for getting the decoded size of the upload
+
+        :return: Size in bytes as integer
+
+        """
+        return len(self.buf)
+
+    def open_file(self):
+        """Method for opening the decoded upload as a separate file object
+
+        A BytesIO cannot be closed while the buffer of getbuffer is exported, so an upload kept in memory is copied
+        into a new BytesIO. An upload in a temporary file is opened again.
+
+        :return: File object positioned at the start of the upload, closed by the caller
+
+        """
+        if self.location is None:
+            return io.BytesIO(self.buf)
+        return open(self.location, 'rb')
+
+    def close(self):
+        """Method for releasing the buffer and removing the temporary file
+
+        :return: None
+
+        """
+        if isinstance(self.buf, memoryview):
+            self.buf.release()
+        elif isinstance(self.buf, mmap.mmap):
+            self.buf.close()
+        self.file.close()
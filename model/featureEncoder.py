@@ -0,0 +1,118 @@
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    print("Pandas/Numpy is not installed")
+    exit()
+
+
+class FeatureEncoder:
+    """Feature Encoder class
+
+    This class encodes the input columns of the dataset (and of an unseen instance) into the codes the models are
+    trained on. The categories of every categorical column are compiled into a dictionary from category to code,
+    the same codes the LabelEncoders give, so a value is encoded with one dictionary lookup. Columns without a table
+    are numeric and are passed on as numbers.
+
+    A value that is not in the table of its column is encoded as the unknown category of that column when the
+    column has this category (for example 'Unknown'), otherwise it is rejected.
+
+    """
+    unknown_category = None
+
+    def __init__(self, columns, tables, unknown_category=None):
+        """Constructor method for making a feature encoder
+
+        :param columns: List of the input columns in the order the models are trained on
+        :param tables: Dictionary of column name and dictionary of category and code, for every categorical column
+        :param unknown_category: Category used for unknown values, None to reject unknown values
+
+        """
+        self.columns = list(columns)
+        self.tables = tables
+        self.unknown_category = unknown_category
+
+    @staticmethod
+    def from_label_encoders(columns, encoders, unknown_category=None):
+        """Method for compiling a feature encoder from fitted LabelEncoders
+
+        :param columns: List of the input columns in the order the models are trained on
+        :param encoders: Dictionary of column name and fitted LabelEncoder, for every categorical column
+        :param unknown_category: Category used for unknown values, None to reject unknown values
+        :return: Feature encoder instance
+
+        """
+        tables = dict((column, dict((str(category), code) for code, category in enumerate(encoder.classes_)))
+                      for column, encoder in encoders.items())
+        return FeatureEncoder(columns, tables, unknown_category)
+
+    def extend(self, column, values):
+        """Method for adding new categories to the table of a column
+
+        New categories get the next free codes, the codes of the existing categories stay the same.
+
+        :param column: Name of the categorical column
+        :param values: Iterable of categories, categories that are already known are skipped
+        :return: Amount of added categories
+
+        """
+        table = self.tables[column]
+        added = 0
+        for value in values:
+            value = str(value)
+            if value not in table:
+                table[value] = len(table)
+                added += 1
+        return added
+
+    def get_code(self, column, value):
+        """Getter method for the code of a single value
+
+        :param column: Name of the categorical column
+        :param value: Category as string
+        :return: Code of the category as integer
+        :raises ValueError: When the value is unknown and the column has no unknown category
+
+        """
+        table = self.tables[column]
+        code = table.get(str(value))
+        if code is None:
+            code = table.get(self.unknown_category)
+            if code is None:
+                raise ValueError("Unknown value '{}' for column {}".format(value, column))
+        return code
+
+    def encode_row(self, row):
+        """Method for encoding a single row
+
+        :param row: Dictionary of column name and value, for every input column
+        :return: Numpy array of the encoded row, in the order of the input columns
+        :raises ValueError: When a value is unknown or not a number
+
+        """
+        return np.array(list(self.get_code(column, row[column]) if column in self.tables else float(row[column])
+                             for column in self.columns))
+
+    def encode_frame(self, dataset):
+        """Method for encoding all rows of a dataset at once, column by column
+
+        Rows with a value that cannot be encoded are marked as invalid and get a placeholder code.
+
+        :param dataset: DataFrame with (at least) the input columns
+        :return: Tuple of the encoded DataFrame and a boolean array marking the valid rows
+
+        """
+        encoded = pd.DataFrame(index=dataset.index)
+        valid = np.ones(len(dataset), dtype=bool)
+        for column in self.columns:
+            if column in self.tables:
+                table = self.tables[column]
+                codes = dataset[column].astype(str).map(table)
+                if self.unknown_category in table:
+                    codes = codes.fillna(table[self.unknown_category])
+            else:
+                codes = pd.to_numeric(dataset[column], errors='coerce')
+            valid &= codes.notna().values
+            codes = codes.fillna(0)
+            encoded[column] = codes.astype(np.int64) if column in self.tables else codes
+        return encoded, valid
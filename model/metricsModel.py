@@ -0,0 +1,81 @@
+try:
+    import warnings
+    import numpy as np
+    import pandas as pd
+    from sklearn.metrics import accuracy_score
+    from sklearn.metrics import confusion_matrix
+    from sklearn.metrics import precision_recall_fscore_support
+except ImportError:
+    print("Pandas/Numpy is not installed")
+    exit()
+
+
+class MetricsInstance:
+    """Metrics Instance class
+
+    This class contains the evaluation metrics of a classification model on the test dataset. The metrics are
+    calculated once when the model is trained, after which the GUI can ask for them without predicting again.
+
+    """
+    accuracy = 0.0
+
+    def __init__(self, accuracy, labels, confusion, precision, recall, f1, support):
+        """Constructor method for making a metrics class instance
+
+        :param accuracy: Accuracy of the model as float
+        :param labels: Array of the (encoded) labels, in the order of the other metrics
+        :param confusion: Confusion matrix as 2D array, true labels as rows and predicted labels as columns
+        :param precision: Array of the precision per label
+        :param recall: Array of the recall per label
+        :param f1: Array of the F1 score per label
+        :param support: Array of the amount of test instances per label
+
+        """
+        self.accuracy = accuracy
+        self.labels = labels
+        self.confusion = confusion
+        self.precision = precision
+        self.recall = recall
+        self.f1 = f1
+        self.support = support
+
+    @staticmethod
+    def from_predictions(true_labels, predicted_labels):
+        """Method for calculating the metrics of the predictions of a model
+
+        :param true_labels: Array of the labels of the test dataset
+        :param predicted_labels: Array of the labels predicted by the model for the test dataset
+        :return: Metrics class instance
+
+        """
+        labels = np.unique(np.concatenate((np.asarray(true_labels), np.asarray(predicted_labels))))
+        with warnings.catch_warnings():
+            # Labels that are never predicted get a precision of 0, which is what the warning is about
+            warnings.simplefilter('ignore')
+            precision, recall, f1, support = precision_recall_fscore_support(true_labels, predicted_labels,
+                                                                             labels=labels)
+        return MetricsInstance(accuracy_score(true_labels, predicted_labels), labels,
+                               confusion_matrix(true_labels, predicted_labels, labels=labels),
+                               precision, recall, f1, support)
+
+    def get_crosstab(self):
+        """Getter method for the confusion matrix as table with totals
+
+        :return: DataFrame with the true labels as rows, the predicted labels as columns and an 'All' row and column
+
+        """
+        table = pd.DataFrame(self.confusion, index=pd.Index(self.labels, name='True'),
+                             columns=pd.Index(self.labels, name='Predicted'))
+        table = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+        table['All'] = table.sum(axis=1)
+        table.loc['All'] = table.sum(axis=0)
+        return table
+
+    def get_class_metrics(self):
+        """Getter method for the metrics per label
+
+        :return: DataFrame with the precision, recall, F1 score and support of every label
+
+        """
+        return pd.DataFrame({'precision': self.precision, 'recall': self.recall, 'f1': self.f1,
+                             'support': self.support}, index=pd.Index(self.labels, name='Label'))
@@ -1,54 +1,294 @@
+try:
+    import socket
+    import numpy as np
+except ImportError:
+    print("Pandas/Numpy is not installed")
+    exit()
+
+# Prefix of an IPv4 address stored in the 16 byte address table (IPv4-mapped IPv6 address)
+IPV4_MAPPED_PREFIX = b'\x00' * 10 + b'\xff\xff'
+# Finest interval of the byte series in seconds, a power of two so every coarser interval holds whole intervals
+SERIES_BASE_WIDTH = 2.0 ** -10
+# Largest amount of intervals of a byte series, the interval is doubled when a capture needs more
+SERIES_MAX_BINS = 16384
+
+
+def pack_address(address):
+    """Function for packing an IP address into the 16 byte form of the address table
+
+    :param address: IPv4 or IPv6 address as string
+    :return: Address as 16 bytes, IPv4 addresses are stored as IPv4-mapped IPv6 addresses
+
+    """
+    if ':' in address:
+        return socket.inet_pton(socket.AF_INET6, address)
+    return IPV4_MAPPED_PREFIX + socket.inet_aton(address)
+
+
+def unpack_address(packed):
+    """Function for turning an entry of the address table back into text
+
+    :param packed: Address as (up to) 16 bytes, numpy drops trailing zero bytes
+    :return: IPv4 or IPv6 address as string
+
+    """
+    packed = packed.ljust(16, b'\x00')
+    if packed.startswith(IPV4_MAPPED_PREFIX):
+        return socket.inet_ntoa(packed[12:])
+    return socket.inet_ntop(socket.AF_INET6, packed)
+
+
+class ByteSeries:
+    """Byte series class
+
+    The byte series keeps the bytes and packets sent per time interval. The intervals are aligned to multiples of
+    the interval width in capture time, so two series can be added up interval by interval. A series never holds
+    more than SERIES_MAX_BINS intervals: when a capture spans more, the width is doubled and pairs of intervals are
+    joined, so the memory use does not depend on the amount of packets or the length of the capture.
+
+    """
+    __slots__ = ('width', 'origin', 'byte_counts', 'packet_counts')
+
+    def __init__(self, width=SERIES_BASE_WIDTH):
+        """Constructor method for making an empty byte series
+
+        :param width: Width of an interval in seconds, SERIES_BASE_WIDTH times a power of two
+
+        """
+        self.width = width
+        self.origin = 0
+        self.byte_counts = np.zeros(0, dtype=np.int64)
+        self.packet_counts = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.byte_counts)
+
+    def add(self, times, lengths):
+        """Method for adding packets to the series
+
+        :param times: Array (float64) of the capture times of the packets in seconds
+        :param lengths: Array of the lengths of the packets on the wire
+        :return: None
+
+        """
+        times = np.asarray(times, dtype=np.float64)
+        if len(times) == 0:
+            return
+        self.add_intervals(self.width, np.floor(times / self.width).astype(np.int64),
+                           np.asarray(lengths, dtype=np.int64), np.ones(len(times), dtype=np.int64))
+
+    def merge(self, other):
+        """Method for adding the intervals of another series to this series
+
+        :param other: ByteSeries, it is not changed
+        :return: None
+
+        """
+        if len(other) > 0:
+            self.add_intervals(other.width, other.origin + np.arange(len(other), dtype=np.int64),
+                               other.byte_counts, other.packet_counts)
+
+    def add_intervals(self, width, indices, byte_counts, packet_counts):
+        """Method for adding counts of intervals of a given width to the series
+
+        :param width: Width of the intervals of the counts in seconds, SERIES_BASE_WIDTH times a power of two
+        :param indices: Array (int64) of the interval numbers, the capture time divided by the width
+        :param byte_counts: Array of the bytes of every interval
+        :param packet_counts: Array of the packets of every interval
+        :return: None
+
+        """
+        if width > self.width:
+            self.coarsen(int(round(np.log2(width / self.width))))
+        elif width < self.width:
+            indices = indices >> int(round(np.log2(self.width / width)))
+        low, high = int(indices.min()), int(indices.max())
+        if len(self) > 0:
+            low, high = min(low, self.origin), max(high, self.origin + len(self) - 1)
+        shift = 0
+        while (high >> shift) - (low >> shift) >= SERIES_MAX_BINS:
+            shift += 1
+        if shift > 0:
+            self.coarsen(shift)
+            indices, low, high = indices >> shift, low >> shift, high >> shift
+        size = high - low + 1
+        totals = np.zeros(size, dtype=np.int64)
+        packets = np.zeros(size, dtype=np.int64)
+        if len(self) > 0:
+            totals[self.origin - low:self.origin - low + len(self)] = self.byte_counts
+            packets[self.origin - low:self.origin - low + len(self)] = self.packet_counts
+        totals += np.bincount(indices - low, weights=byte_counts, minlength=size).astype(np.int64)
+        packets += np.bincount(indices - low, weights=packet_counts, minlength=size).astype(np.int64)
+        self.origin, self.byte_counts, self.packet_counts = low, totals, packets
+
+    def coarsen(self, shift):
+        """Method for joining the intervals into intervals of 2 ** shift times the width
+
+        :param shift: Amount of times the width is doubled
+        :return: None
+
+        """
+        self.width *= 2 ** shift
+        if len(self) == 0:
+            return
+        indices = (self.origin + np.arange(len(self), dtype=np.int64)) >> shift
+        origin = int(indices[0])
+        self.byte_counts = np.bincount(indices - origin, weights=self.byte_counts).astype(np.int64)
+        self.packet_counts = np.bincount(indices - origin, weights=self.packet_counts).astype(np.int64)
+        self.origin = origin
+
+    def get_starts(self, start_time):
+        """Getter method for the start of every interval relative to a time
+
+        :param start_time: Capture time in seconds the starts are relative to, the time of the first packet
+        :return: Array (float64) of the interval starts in seconds, the first start is at least 0
+
+        """
+        starts = (self.origin + np.arange(len(self), dtype=np.float64)) * self.width - start_time
+        return np.maximum(starts, 0.0)
+
+
 class StatsInstance:
     """Statistics Instance class
 
     This class contains all information about pcap-files, which will be calculated by the controller and
     passed to the GUI. The GUI will use this instance to visualise statistical data about the pcap-file.
 
+    Nothing is stored per packet. IP addresses and protocol names are kept in a table with every distinct value once
+    and the amount of IP packets of every value, and the bytes sent over time are kept as a byte series, so the size
+    of an instance does not grow with the amount of packets of the capture.
+
     """
-    tcp_count = 0
-    udp_count = 0
-    dns_count = 0
-    icmp_count = 0
-    src_addresses = []
-    dst_addresses = []
-    unique_source = []
-    unique_dest = []
-    sent_bytes = []
-    time_list = []
-    protocols_used = []
-    total_time = 0
-    throughput_time = []
-    filename = ""
-
-    def __init__(self, tcp, udp, dns, icmp, src, dst, un_src, un_dest, sent_bytes, time_list, proto, totime,
-                 filename):
+    __slots__ = ('tcp_count', 'udp_count', 'dns_count', 'icmp_count', 'address_table', 'src_counts', 'dst_counts',
+                 'protocol_table', 'protocol_counts', 'byte_series', 'start_time', 'total_time', 'total_bytes',
+                 'packet_count', 'throughput_time', 'top_flows', 'flow_count', 'filename')
+
+    def __init__(self, tcp, udp, dns, icmp, address_table, src_counts, dst_counts, protocol_table, protocol_counts,
+                 byte_series, start_time, totime, filename, packet_count=0, top_flows=None, flow_count=0):
         """Constructor method for making a statistics class instance
 
         :param tcp: Amount of TCP packets as integer
         :param udp: Amount of UDP packets as integer
         :param dns: Amount of DNS packets as integer
         :param icmp: Amount of ICMP packets as integer
-        :param src: List of source IP addresses
-        :param dst: List of destination IP addresses
-        :param un_src: List of unique source IP addresses
-        :param un_dest: List of unique destination IP addresses
-        :param sent_bytes: List of packet sizes sent
-        :param time_list: List of the time packets are sent in seconds
-        :param proto: List of protocols used
+        :param address_table: Array (S16) of the distinct IP addresses, packed with pack_address
+        :param src_counts: Array (int64) of the amount of IP packets sent from every address of the table
+        :param dst_counts: Array (int64) of the amount of IP packets sent to every address of the table
+        :param protocol_table: List of the distinct protocol names
+        :param protocol_counts: Array (int64) of the amount of IP packets of every protocol of the table
+        :param byte_series: ByteSeries of the Ethernet packets
+        :param start_time: Capture time of the first packet in seconds
         :param totime: Integer of total session time
         :param filename: Filename of selected file
+        :param packet_count: Amount of packets in the capture
+        :param top_flows: Structured array of the largest flows by bytes, with packed src and dst addresses, sport,
+                          dport, protocol name, bytes, packets and first and last time in seconds
+        :param flow_count: Total amount of flows in the capture
 
         """
         self.tcp_count = tcp
         self.udp_count = udp
         self.dns_count = dns
         self.icmp_count = icmp
-        self.src_addresses = src
-        self.dst_addresses = dst
-        self.unique_source = un_src
-        self.unique_dest = un_dest
-        self.sent_bytes = sent_bytes
-        self.time_list = time_list
-        self.protocols_used = proto
+        self.address_table = np.asarray(address_table, dtype='S16')
+        self.src_counts = np.asarray(src_counts, dtype=np.int64)
+        self.dst_counts = np.asarray(dst_counts, dtype=np.int64)
+        self.protocol_table = list(protocol_table)
+        self.protocol_counts = np.asarray(protocol_counts, dtype=np.int64)
+        self.byte_series = byte_series
+        self.start_time = start_time
         self.total_time = totime
+        self.total_bytes = int(byte_series.byte_counts.sum())
+        self.packet_count = packet_count
+        self.throughput_time = {}
+        self.top_flows = top_flows
+        self.flow_count = flow_count
         self.filename = filename
+
+    @property
+    def unique_source(self):
+        """Getter method for the distinct source IP addresses
+
+        :return: Set of source IP addresses as strings
+
+        """
+        return set(self.decode_addresses(np.flatnonzero(self.src_counts)))
+
+    @property
+    def unique_dest(self):
+        """Getter method for the distinct destination IP addresses
+
+        :return: Set of destination IP addresses as strings
+
+        """
+        return set(self.decode_addresses(np.flatnonzero(self.dst_counts)))
+
+    def decode_addresses(self, codes):
+        """Method for turning positions in the address table into IP addresses
+
+        :param codes: Array of positions in the address table
+        :return: List of IP addresses as strings
+
+        """
+        return list(unpack_address(self.address_table[code]) for code in codes)
+
+    def address_counts(self, counts):
+        """Method for getting the addresses that occur in a column of address counts
+
+        :param counts: Array of address counts, src_counts or dst_counts
+        :return: Tuple of a list of IP addresses and an array with the count of each address
+
+        """
+        present = np.flatnonzero(counts)
+        return self.decode_addresses(present), counts[present]
+
+    def get_sent_bytes(self):
+        """Getter method for the bytes sent over time
+
+        :return: Tuple of arrays with the interval starts in seconds after the first packet and the bytes sent
+                 before every interval
+
+        """
+        counts = self.byte_series.byte_counts
+        return self.byte_series.get_starts(self.start_time), np.cumsum(counts) - counts
+
+    def get_throughput(self, bin_width, peak_bins):
+        """Getter method for the throughput of the capture per time interval
+
+        The intervals of the byte series are joined into intervals of about bin_width seconds, a whole amount of
+        byte series intervals. The result is kept per bin width in throughput_time, so asking for the same bin width
+        again costs nothing.
+
+        :param bin_width: Width of an interval in seconds
+        :param peak_bins: Amount of intervals over which the rolling peak is taken
+        :return: Tuple of arrays with the interval start times, bytes/s, packets/s and rolling peak bytes/s
+
+        """
+        key = (bin_width, peak_bins)
+        if key not in self.throughput_time:
+            series = self.byte_series
+            factor = max(int(round(bin_width / series.width)), 1)
+            width = factor * series.width
+            indices = (series.origin + np.arange(len(series), dtype=np.int64)) // factor
+            first = int(indices[0]) if len(indices) > 0 else 0
+            bytes_per_second = np.bincount(indices - first, weights=series.byte_counts) / width
+            packets_per_second = np.bincount(indices - first, weights=series.packet_counts) / width
+            peak_bins = max(peak_bins, 1)
+            padded = np.concatenate((np.zeros(peak_bins - 1), bytes_per_second))
+            if len(bytes_per_second) > 0:
+                peak = np.lib.stride_tricks.sliding_window_view(padded, peak_bins).max(axis=1)
+            else:
+                peak = bytes_per_second
+            starts = np.maximum((first + np.arange(len(bytes_per_second))) * width - self.start_time, 0.0)
+            self.throughput_time[key] = (starts, bytes_per_second, packets_per_second, peak)
+        return self.throughput_time[key]
+
+    def nbytes(self):
+        """Method for calculating the memory used by the columns of this instance
+
+        :return: Size in bytes as integer
+
+        """
+        return (self.address_table.nbytes + self.src_counts.nbytes + self.dst_counts.nbytes +
+                self.protocol_counts.nbytes + self.byte_series.byte_counts.nbytes +
+                self.byte_series.packet_counts.nbytes)
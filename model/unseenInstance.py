@@ -94,6 +94,26 @@ class UnseenInstance:
                        self.activity])
         return ph
 
+    def get_feature_row(self):
+        """ Method for returning all variables by the column names of the dataset
+
+        :return: Returns dictionary of column name and value of this Unseen Instance
+
+        """
+        return {'ModemType': self.modem_type,
+                'HasRouter': self.has_router,
+                'RouterType': self.router_type,
+                'RouterSoftware': self.router_firmware,
+                'Subscription': self.subscription,
+                'Ping': self.test_ping,
+                'TestDownload': self.test_download,
+                'TestUpload': self.test_upload,
+                'ConnectionType': self.connection,
+                'NetworkCard': self.network_card,
+                'ExternalNIC': self.has_pcicard,
+                'Processor': self.processor_type,
+                'Activities': self.activity}
+
     def get_encoded_array(self):
         """ Method for returning encoded array of all variables. ONLY use for machine learning predictions!
 
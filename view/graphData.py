@@ -0,0 +1,62 @@
+try:
+    import numpy as np
+except ImportError:
+    print("Pandas/Numpy is not installed")
+    exit()
+
+
+def top_counts(labels, counts, limit):
+    """Function for reducing counted values to the most frequent ones for a bar graph
+
+    :param labels: List of the counted values
+    :param counts: Array with the count of each value
+    :param limit: Amount of values to keep, the remaining values are summed up as 'Other'
+    :return: Tuple of a list of labels and a list of counts, ordered from most to least frequent
+
+    """
+    counts = np.asarray(counts)
+    order = np.argsort(-counts, kind='stable')
+    top = order[:limit]
+    top_labels = list(labels[i] for i in top)
+    top_values = list(int(counts[i]) for i in top)
+    if len(order) > limit:
+        top_labels.append('Other')
+        top_values.append(int(counts[order[limit:]].sum()))
+    return top_labels, top_values
+
+
+def lttb(x, y, threshold):
+    """Function for downsampling a series with the Largest-Triangle-Three-Buckets algorithm
+
+    The points are split into buckets and from every bucket the point forming the largest triangle with the
+    previously chosen point and the average of the next bucket is kept. This keeps the peaks and the shape of the
+    series with a fixed amount of points.
+
+    :param x: Array of x values, sorted
+    :param y: Array of y values
+    :param threshold: Amount of points to keep
+    :return: Tuple of the downsampled x and y arrays
+
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    length = len(x)
+    if threshold >= length or threshold < 3:
+        return x, y
+    edges = np.linspace(1, length - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = length - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            average_x = x[end:edges[bucket + 2]].mean()
+            average_y = y[end:edges[bucket + 2]].mean()
+        else:
+            average_x, average_y = x[-1], y[-1]
+        area = np.abs((x[previous] - average_x) * (y[start:end] - y[previous]) -
+                      (x[previous] - x[start:end]) * (average_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return x[selected], y[selected]
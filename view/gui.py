@@ -6,10 +6,25 @@ try:
     from dash.dependencies import Input, Output, State
     # Importing plotly
     import plotly.graph_objs as go
-    # Importing base64
-    import base64
-    # Importing os
+    from plotly.utils import PlotlyJSONEncoder
+    # Importing os, time and json
     import os
+    import time
+    import json
+    # Importing hashlib and mimetypes for the static assets
+    import hashlib
+    import mimetypes
+    # Importing io and flask for the ingestion and metrics endpoints
+    import io
+    from flask import request, jsonify, Response
+    # Importing graph data helpers
+    from view import graphData
+    # Importing the statistics model for the address format of the flows
+    from model import statsModel
+    # Importing the unseen instance model for checking the demo inputs
+    from model import unseenInstance
+    # Importing the stage metrics for timing the figures and serving the metrics
+    from controller import stageMetrics
 except ImportError as e:
     print("The following error occurred: " + e.__str__())
     exit()
@@ -23,6 +38,12 @@ class Gui:
     """
     app = ""
     controller = ""
+    # Static assets by file name, as tuples of the contents, the mimetype and the ETag
+    assets = {}
+    # Page layouts that are built, by the name of the method that builds them
+    pages = {}
+    # Method that builds the page of every path, other paths get the error page
+    page_methods = {'/': 'get_demo', '/demo': 'get_demo', '/statistics': 'get_statistics'}
 
     def __init__(self, controller):
         """GUI class constructor for initializing GUI
@@ -32,10 +53,14 @@ class Gui:
         """
         self.app = dash.Dash()
         self.controller = controller
+        self.assets = {}
+        self.pages = {}
         self.load_stylesheets()
+        self.load_assets()
         self.app.config.supress_callback_exceptions = True
         self.app.layout = self.get_overview()
         self.get_callbacks()
+        self.get_routes()
 
     def load_stylesheets(self):
         """Method for loading in style sheets
@@ -49,6 +74,57 @@ class Gui:
         for css in external_css:
             self.app.css.append_css({"external_url": css})
 
+    def load_assets(self):
+        """Method for loading the static assets
+
+        The assets of ASSET_PATHS and the logo are read once and served by the assets route, with their ETag
+        computed from the contents.
+
+        :return: None
+
+        """
+        paths = self.controller.config['DEFAULT'].get('ASSET_PATHS', []) + [
+            self.controller.config['DEFAULT']['LOGO_PATH']]
+        for path in paths:
+            with open(os.getcwd() + path, 'rb') as f:
+                contents = f.read()
+            mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            self.assets[os.path.basename(path)] = (contents, mimetype, hashlib.sha256(contents).hexdigest()[:16])
+
+    def get_asset_url(self, path):
+        """Getter method for the URL of a static asset
+
+        The ETag is part of the URL, so browsers can keep the asset as long as ASSETS_MAX_AGE allows and still get
+        a changed asset at once.
+
+        :param path: Path of the asset as in the config
+        :return: URL of the asset as string
+
+        """
+        name = os.path.basename(path)
+        return '{}{}?v={}'.format(self.controller.config['DEFAULT'].get('ASSETS_ROUTE', '/assets/'), name,
+                                  self.assets[name][2])
+
+    def get_page(self, pathname):
+        """Getter method for the page layout of a path
+
+        Every page is built once and kept as JSON data, so a navigation neither builds nor converts the component
+        tree again. The demo page is only kept when all models are ready, until then it is built on every
+        navigation because it shows the models that are still warming up.
+
+        :param pathname: Path of the page
+        :return: Page layout as JSON data
+
+        """
+        method = self.page_methods.get(pathname, 'get_error')
+        page = self.pages.get(method)
+        if page is None:
+            page = json.loads(json.dumps(getattr(self, method)(), cls=PlotlyJSONEncoder))
+            if method != 'get_demo' or all(self.controller.is_ready(name)
+                                           for name in self.controller.readiness_names):
+                self.pages[method] = page
+        return page
+
     @staticmethod
     def get_overview():
         """Getter method that loads the main overview HTML
@@ -213,20 +289,57 @@ class Gui:
                 html.Div([
                     html.H2(children='Output:'),
                     html.Div(id='model-output')
-                ])
+                ]),
+                self.get_model_status()
         ])
         return demo_page
 
-    @staticmethod
-    def get_statistics_inner(packets):
+    def get_model_status(self):
+        """Getter method to load the status of the models that are still training
+
+        :return: Model status component variable, empty when all models are ready
+
+        """
+        labels = {'encoders': 'Encoders', 'kmodes': 'KModes', 'kmeans': 'KMeans', 'nb_model': 'Naive Bayes',
+                  'rf_model': 'Random Forest'}
+        warming_up = list(labels[name] for name in self.controller.readiness_names
+                          if not self.controller.is_ready(name))
+        if not warming_up:
+            return html.Div(id='model-status')
+        return html.Div([
+            html.P(["Model warming up: " + ", ".join(warming_up)])
+        ], id='model-status')
+
+    def get_statistics_inner(self, packets):
         """Getter method to load statistics page information inner component HTML
 
-        This page is the inner page containing all the information of the pcap analytics page.
+        This page is the inner page containing all the information of the pcap analytics page. The graph data is
+        reduced on the server: the address graph shows the GRAPH_TOP_ADDRESSES most frequent addresses and the
+        bytes graph is downsampled to GRAPH_MAX_POINTS points, so the page size does not grow with the capture.
 
+        :param self: Self instance of GUI
         :param packets: Packets variable as StatsInstance class
         :return: Statistical information component variable containing HTML and graphs about the pcap-file
 
         """
+        start = time.perf_counter()
+        top_addresses = self.controller.config['DEFAULT']['GRAPH_TOP_ADDRESSES']
+        dst_labels, dst_counts = graphData.top_counts(*packets.address_counts(packets.dst_counts), top_addresses)
+        src_labels, src_counts = graphData.top_counts(*packets.address_counts(packets.src_counts), top_addresses)
+        time_points, byte_points = graphData.lttb(*packets.get_sent_bytes(),
+                                                  self.controller.config['DEFAULT']['GRAPH_MAX_POINTS'])
+        bin_starts, bytes_rate, packets_rate, peak_rate = packets.get_throughput(
+            self.controller.config['DEFAULT']['THROUGHPUT_BIN_SECONDS'],
+            self.controller.config['DEFAULT']['THROUGHPUT_PEAK_BINS']
+        )
+        rate_times, bytes_rate = graphData.lttb(bin_starts, bytes_rate,
+                                                self.controller.config['DEFAULT']['GRAPH_MAX_POINTS'])
+        peak_times, peak_rate = graphData.lttb(bin_starts, peak_rate,
+                                               self.controller.config['DEFAULT']['GRAPH_MAX_POINTS'])
+        packet_times, packets_rate = graphData.lttb(bin_starts, packets_rate,
+                                                    self.controller.config['DEFAULT']['GRAPH_MAX_POINTS'])
+        stageMetrics.REGISTRY.observe('figure_data', time.perf_counter() - start)
+        start = time.perf_counter()
         statistics_div = html.Div([
             html.Div([
                 html.H4(["Packet information"]),
@@ -243,16 +356,18 @@ class Gui:
                 dcc.Graph(
                     figure=go.Figure(
                         data=[
-                            go.Histogram(
-                                x=list(packets.dst_addresses),
+                            go.Bar(
+                                x=dst_labels,
+                                y=dst_counts,
                                 name='Destination Addresses',
                                 marker=go.Marker(
                                     color='rgb(66, 10, 99)'
                                 ),
                                 opacity=0.75
                             ),
-                            go.Histogram(
-                                x=list(packets.src_addresses),
+                            go.Bar(
+                                x=src_labels,
+                                y=src_counts,
                                 name='Source Addresses',
                                 marker=go.Marker(
                                     color='rgb(10, 99, 66)'
@@ -261,18 +376,19 @@ class Gui:
                             )
                         ],
                         layout=go.Layout(
-                            title='Histogram of source and destination addresses',
+                            title='Most frequent source and destination addresses',
                             showlegend=True,
                             legend=go.Legend(
                                 x=0,
                                 y=1.0
                             ),
                             xaxis=dict(
-                                title='Value'
+                                title='IP address'
                             ),
                             yaxis=dict(
-                                title='IP address'
+                                title='Amount of packets'
                             ),
+                            barmode='group',
                             bargap=0.2,
                             bargroupgap=0.1
                         )
@@ -284,8 +400,8 @@ class Gui:
                     figure=go.Figure(
                         data=[
                             go.Scatter(
-                                x=list(packets.time_list),
-                                y=list(packets.sent_bytes),
+                                x=time_points.tolist(),
+                                y=byte_points.tolist(),
                                 name='Bytes of data sent over time',
                                 marker=go.Marker(
                                     color='rgb(55, 83, 109)'
@@ -309,11 +425,102 @@ class Gui:
                     ),
                     style={'height': 400},
                     id='bytesPlot'
+                ),
+                dcc.Graph(
+                    figure=go.Figure(
+                        data=[
+                            go.Scatter(
+                                x=rate_times.tolist(),
+                                y=bytes_rate.tolist(),
+                                name='Bytes per second',
+                                marker=go.Marker(
+                                    color='rgb(55, 83, 109)'
+                                )
+                            ),
+                            go.Scatter(
+                                x=peak_times.tolist(),
+                                y=peak_rate.tolist(),
+                                name='Rolling peak bytes per second',
+                                line=dict(
+                                    dash='dot'
+                                ),
+                                marker=go.Marker(
+                                    color='rgb(99, 10, 10)'
+                                )
+                            ),
+                            go.Scatter(
+                                x=packet_times.tolist(),
+                                y=packets_rate.tolist(),
+                                name='Packets per second',
+                                yaxis='y2',
+                                marker=go.Marker(
+                                    color='rgb(10, 99, 66)'
+                                )
+                            )
+                        ],
+                        layout=go.Layout(
+                            title='Bandwidth over time',
+                            showlegend=True,
+                            legend=go.Legend(
+                                x=0,
+                                y=1.0
+                            ),
+                            xaxis=dict(
+                                title='Time (s)'
+                            ),
+                            yaxis=dict(
+                                title='Throughput (bytes/s)'
+                            ),
+                            yaxis2=dict(
+                                title='Throughput (packets/s)',
+                                overlaying='y',
+                                side='right'
+                            )
+                        )
+                    ),
+                    style={'height': 400},
+                    id='throughputPlot'
                 )
-            ])
+            ]),
+            self.get_flow_table(packets)
         ])
+        stageMetrics.REGISTRY.observe('figures', time.perf_counter() - start)
         return statistics_div
 
+    def get_flow_table(self, packets):
+        """Getter method to load the table of the largest flows of the statistics page
+
+        A flow is all traffic with the same source and destination address and port and protocol. The table shows
+        the FLOW_TOP flows with the most bytes.
+
+        :param self: Self instance of GUI
+        :param packets: Packets variable as StatsInstance class
+        :return: Flow table component variable containing HTML
+
+        """
+        header = html.Tr([html.Th("Source"), html.Th("Destination"), html.Th("Protocol"), html.Th("Packets"),
+                          html.Th("Bytes"), html.Th("Start (s)"), html.Th("Duration (s)")])
+        rows = [header]
+        top_flows = packets.top_flows if packets.top_flows is not None else []
+        for flow in top_flows[:self.controller.config['DEFAULT']['FLOW_TOP']]:
+            src = statsModel.unpack_address(flow['src'])
+            dst = statsModel.unpack_address(flow['dst'])
+            if flow['sport'] or flow['dport']:
+                if ':' in src:
+                    src, dst = "[" + src + "]", "[" + dst + "]"
+                src += ":" + str(flow['sport'])
+                dst += ":" + str(flow['dport'])
+            rows.append(html.Tr([html.Td(src), html.Td(dst), html.Td(str(flow['protocol'])),
+                                 html.Td(str(flow['packets'])), html.Td(str(flow['bytes'])),
+                                 html.Td(str(round(float(flow['first']), 2))),
+                                 html.Td(str(round(float(flow['last'] - flow['first']), 2)))]))
+        flow_div = html.Div([
+            html.H4(["Top flows"]),
+            html.P(["Amount of flows: " + str(packets.flow_count)]),
+            html.Table(rows)
+        ])
+        return flow_div
+
     def get_statistics(self):
         """Getter method that loads statistics page HTML without any information
 
@@ -370,14 +577,52 @@ class Gui:
         return error
 
     def get_logo(self):
-        image_filename = os.getcwd() + self.controller.config['DEFAULT']["LOGO_PATH"]  # replace with your own image
-        encoded_image = base64.b64encode(open(image_filename, 'rb').read())
+        image_url = self.get_asset_url(self.controller.config['DEFAULT']["LOGO_PATH"])  # replace with your own image
         logo = html.Div([
-                html.Img(src='data:image/png;base64,{}'.format(encoded_image.decode()),  style={'display': 'block',
-                                                                                                'margin': 'auto'})
+                html.Img(src=image_url, style={'display': 'block', 'margin': 'auto'})
         ])
         return logo
 
+    def get_routes(self):
+        """Getter method to register the HTTP routes next to the pages
+
+        GET /assets/<name> serves the static assets with their ETag and a Cache-Control header of ASSETS_MAX_AGE
+        seconds, a request with the current ETag gets 304 Not Modified. POST /ingest takes labeled rows as CSV in
+        the layout of the dataset and adds them to the models, it is only registered with INGEST_ENDPOINT enabled.
+        GET /metrics serves the stage metrics in the Prometheus text format, it is only registered with
+        STAGE_METRICS enabled.
+
+        :return: Nothing
+
+        """
+        @self.app.server.route(self.controller.config['DEFAULT'].get('ASSETS_ROUTE', '/assets/') + '<name>',
+                               methods=['GET'])
+        def asset(name):
+            if name not in self.assets:
+                return Response('Asset not found', status=404)
+            contents, mimetype, etag = self.assets[name]
+            response = Response(contents, mimetype=mimetype)
+            response.set_etag(etag)
+            response.cache_control.public = True
+            response.cache_control.max_age = self.controller.config['DEFAULT'].get('ASSETS_MAX_AGE', 31536000)
+            return response.make_conditional(request)
+
+        if self.controller.config['DEFAULT'].get('INGEST_ENDPOINT', False):
+            @self.app.server.route('/ingest', methods=['POST'])
+            def ingest():
+                if not all(self.controller.is_ready(name) for name in self.controller.readiness_names):
+                    return jsonify({'error': 'The models are warming up'}), 503
+                try:
+                    used = self.controller.ingest_csv(io.StringIO(request.get_data(as_text=True)))
+                except ValueError as ex:
+                    return jsonify({'error': ex.__str__()}), 400
+                return jsonify({'used': used})
+
+        if self.controller.config['DEFAULT'].get('STAGE_METRICS', False):
+            @self.app.server.route('/metrics', methods=['GET'])
+            def metrics():
+                return Response(stageMetrics.REGISTRY.render(), content_type=stageMetrics.CONTENT_TYPE)
+
     def get_callbacks(self):
         """Getter method to retrieve all callbacks of the pages
 
@@ -408,31 +653,42 @@ class Gui:
         def update_output(n_clicks, modem_type, has_router, router_type, router_firmware,
                           subscription, test_upload, test_download, test_ping, processor_type,
                           network_card, has_pcicard, connection, activity):
-            self.controller.create_unseen_instance(
+            instance = unseenInstance.UnseenInstance(
                 modem_type, has_router, router_type, router_firmware,
                 subscription, test_upload, test_download, test_ping, processor_type,
                 network_card, has_pcicard, connection, activity
             )
-            if self.controller.unseen_instance.is_empty():
+            if instance.is_empty():
                 return "Lege velden ontdekt!"
             else:
+                if not self.controller.is_ready('encoders'):
+                    return "The models are warming up, try again in a moment."
                 try:
-                    self.controller.create_encoded_instance()
+                    predictions = self.controller.predict(
+                        modem_type, has_router, router_type, router_firmware,
+                        subscription, test_upload, test_download, test_ping, processor_type,
+                        network_card, has_pcicard, connection, activity
+                    )
                 except ValueError:
                     return "Inserted inputs are unknown to the models."
-                kmodes_pred = self.controller.get_kmodes_prediction()
-                kmeans_pred = self.controller.get_kmeans_prediction()
-                nb_pred = self.controller.get_bayes_prediction()
-                rf_pred = self.controller.get_rf_prediction()
-                acc_nb = self.controller.get_bayes_accuracy()
-                acc_rf = self.controller.get_rf_accuracy()
+                warming_up = "model warming up"
+                kmodes_pred, kmeans_pred, nb_pred, rf_pred = list(
+                    warming_up if predictions[name] is None else str(predictions[name])
+                    for name in ('kmodes', 'kmeans', 'nb_model', 'rf_model')
+                )
+                acc_nb = warming_up
+                acc_rf = warming_up
+                if predictions['nb_model'] is not None:
+                    acc_nb = str(round(self.controller.get_bayes_accuracy(), 2)) + "%"
+                if predictions['rf_model'] is not None:
+                    acc_rf = str(round(self.controller.get_rf_accuracy(), 2)) + "%"
                 output = html.Div([
-                    html.P(["Unseen instance assigned to kmodes cluster: " + str(kmodes_pred)]),
-                    html.P(["Unseen instance assigned to kmeans cluster: " + str(kmeans_pred)]),
-                    html.P(["Advice from Naive Bayes Algorithm: " + str(str(nb_pred))]),
-                    html.P(["Advice from Random Forest Algorithm: " + str(str(rf_pred))]),
-                    html.P(["Accuracy of Naive Bayes Model: " + str(round(acc_nb, 2)) + "%"]),
-                    html.P(["Accuracy of Random Forest Model: " + str(round(acc_rf, 2)) + "%"]),
+                    html.P(["Unseen instance assigned to kmodes cluster: " + kmodes_pred]),
+                    html.P(["Unseen instance assigned to kmeans cluster: " + kmeans_pred]),
+                    html.P(["Advice from Naive Bayes Algorithm: " + nb_pred]),
+                    html.P(["Advice from Random Forest Algorithm: " + rf_pred]),
+                    html.P(["Accuracy of Naive Bayes Model: " + acc_nb]),
+                    html.P(["Accuracy of Random Forest Model: " + acc_rf]),
                 ])
                 return output
 
@@ -440,23 +696,19 @@ class Gui:
         @self.app.callback(dash.dependencies.Output('page-content', 'children'),
                            [dash.dependencies.Input('url', 'pathname')])
         def display_page(pathname):
-            if pathname == '/' or pathname == '/demo':
-                return self.get_demo()
-            elif pathname == '/statistics':
-                return self.get_statistics()
-            else:
-                return self.get_error()
+            return self.get_page(pathname)
 
         # Callback for statistics page (PCAP)
         @self.app.callback(Output('output-data-upload', 'children'),
-                           [Input('upload-data', 'filename')])
-        def update_output(filename):
-            if filename is None or "":
+                           [Input('upload-data', 'contents')],
+                           state=[State('upload-data', 'filename')])
+        def update_output(contents, filename):
+            if filename is None or "" or contents is None:
                 return "Select a file"
             else:
                 if 'pcap' in filename:
                     try:
-                        packets = self.controller.parse_filename(filename)
+                        packets = self.controller.parse_contents(contents, filename)
                         return self.get_statistics_inner(packets)
                     except Exception as ex:
                         return 'Something went wrong with loading in the file: ' + ex.__str__()